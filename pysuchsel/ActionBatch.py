@@ -0,0 +1,162 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import contextlib
+from .BaseAction import BaseAction
+
+class ActionBatch(BaseAction):
+	def _load_manifest(self, filename):
+		# Returns the default options that apply to all jobs (where the
+		# command supports them) and the list of jobs
+		if os.path.splitext(filename)[1].lower() == ".csv":
+			with open(filename, newline = "") as f:
+				# Empty cells mean that the default value is used
+				return ({ }, [ { key: value for (key, value) in row.items() if (value is not None) and (value.strip() != "") } for row in csv.DictReader(f) ])
+		else:
+			with open(filename) as f:
+				manifest = json.load(f)
+			if isinstance(manifest, list):
+				return ({ }, manifest)
+			return (manifest.get("defaults", { }), manifest["jobs"])
+
+	@staticmethod
+	def _is_true(value):
+		if isinstance(value, str):
+			return value.lower() in [ "1", "true", "yes", "on" ]
+		return bool(value)
+
+	def _job_cmdline(self, parser, job):
+		job = { key.replace("-", "_"): value for (key, value) in job.items() if key != "command" }
+		defaults = { key.replace("-", "_"): value for (key, value) in self._defaults.items() if key != "command" }
+		supported = set(action.dest for action in parser._actions)
+		job = dict({ key: value for (key, value) in defaults.items() if (key in supported) and (key not in job) }, **job)
+		cmdline = [ ]
+		positionals = [ ]
+		used = set()
+		for action in parser._actions:
+			if action.dest not in job:
+				continue
+			used.add(action.dest)
+			value = job[action.dest]
+			if len(action.option_strings) == 0:
+				positionals.append(str(value))
+				continue
+
+			option = action.option_strings[-1]
+			if isinstance(action, argparse._StoreTrueAction):
+				if self._is_true(value):
+					cmdline.append(option)
+			elif isinstance(action, argparse._CountAction):
+				cmdline += [ option ] * int(value)
+			elif isinstance(action, argparse._AppendAction):
+				values = value.split() if isinstance(value, str) else value
+				for item in values:
+					cmdline += [ option, str(item) ]
+			else:
+				cmdline += [ option, str(value) ]
+
+		unknown = set(job) - used
+		if len(unknown) > 0:
+			raise Exception("Unknown option(s) in job: %s" % (", ".join(sorted(unknown))))
+		return cmdline + [ "--" ] + positionals
+
+	def _run_job(self, numbered_job):
+		# Runs inside a worker process when more than one job is given
+		from .__main__ import create_multicommand
+
+		(job_no, job) = numbered_job
+		result = {
+			"job":		job_no,
+			"command":	job.get("command", self._defaults.get("command")),
+			"outfile":	job.get("outfile"),
+		}
+		output = io.StringIO()
+		t0 = time.time()
+		try:
+			mc = create_multicommand()
+			command = mc.get_command(result["command"])
+			action = mc.resolve_action(command)
+			if action is type(self):
+				raise Exception("Batch jobs cannot be nested.")
+			parser = mc.create_parser(command, silent = True)
+			args = parser.parse_args(self._job_cmdline(parser, job))
+			if self._parallel and (getattr(args, "jobs", 1) > 1):
+				# Worker processes of the pool cannot start processes of their own
+				raise Exception("Jobs cannot use more than one process when the batch runs with --jobs.")
+			with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+				action(command.name, args)
+			result["status"] = "ok"
+		except Exception as e:
+			result["status"] = "error"
+			result["error"] = "%s: %s" % (e.__class__.__name__, str(e))
+		except SystemExit as e:
+			# Actions that reject their options exit after printing an error
+			# message
+			lines = output.getvalue().splitlines()
+			result["status"] = "error"
+			result["error"] = lines[-1] if (len(lines) > 0) else "Exited with status %s" % (e.code)
+		result["time"] = time.time() - t0
+		result["output"] = output.getvalue().splitlines()
+		return result
+
+	def run(self):
+		(self._defaults, jobs) = self._load_manifest(self._args.manifest)
+		jobs = list(enumerate(jobs, 1))
+		t0 = time.time()
+		results = [ ]
+		self._parallel = (self._args.jobs > 1) and (len(jobs) > 1)
+		if self._parallel:
+			import multiprocessing
+			with multiprocessing.Pool(self._args.jobs) as pool:
+				for result in pool.imap_unordered(self._run_job, jobs):
+					self._report(result)
+					results.append(result)
+		else:
+			for job in jobs:
+				result = self._run_job(job)
+				self._report(result)
+				results.append(result)
+		results.sort(key = lambda result: result["job"])
+		total_time = time.time() - t0
+
+		failed = sum(1 for result in results if result["status"] != "ok")
+		print("%d of %d jobs succeeded in %.3f seconds." % (len(results) - failed, len(results), total_time))
+		if self._args.report is not None:
+			with open(self._args.report, "w") as f:
+				json.dump({ "total_time": total_time, "jobs": results }, f, indent = 4)
+				f.write("\n")
+		if failed > 0:
+			sys.exit(1)
+
+	def _report(self, result):
+		print("%4d %-5s %8.3fs %s" % (result["job"], result["status"], result["time"], result["outfile"] or ""))
+		if result["status"] != "ok":
+			print("     %s" % (result["error"]))
+		if self._args.verbose >= 1:
+			for line in result["output"]:
+				print("     %s" % (line))
@@ -0,0 +1,126 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+import json
+import time
+import subprocess
+from .BaseAction import BaseAction
+from .Benchmark import Benchmark
+
+class ActionBenchmark(BaseAction):
+	_STARTUP_SCRIPT = "from pysuchsel.__main__ import create_multicommand; mc = create_multicommand(); mc.resolve_action(mc.get_command(%r))"
+
+	@staticmethod
+	def _parse_importtime(stderr):
+		# Lines look like "import time: self [us] | cumulative | imported package"
+		modules = [ ]
+		for line in stderr.splitlines():
+			if not line.startswith("import time:"):
+				continue
+			fields = line[len("import time:"):].split("|")
+			if (len(fields) != 3) or (not fields[0].strip().isdigit()):
+				continue
+			modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+		return modules
+
+	def _startup(self, commandname):
+		script = self._STARTUP_SCRIPT % (commandname)
+		wall_times = [ ]
+		for _ in range(self._args.repeat):
+			t0 = time.time()
+			proc = subprocess.run([ sys.executable, "-X", "importtime", "-c", script ], stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, check = True, text = True)
+			wall_times.append(time.time() - t0)
+		modules = self._parse_importtime(proc.stderr)
+		return {
+			"command":		commandname,
+			"wall_time":	min(wall_times),
+			"import_time":	sum(selftime for (name, selftime, cumulative) in modules) / 1e6,
+			"modules":		len(modules),
+			"slowest":		[ { "module": name, "self_time": selftime / 1e6 } for (name, selftime, cumulative) in sorted(modules, key = lambda module: -module[1])[:self._args.top] ],
+		}
+
+	def _run_startup(self):
+		commands = self._args.command or [ "suchsel", "crossword", "solword", "crypto", "fonttest", "batch", "serve", "find" ]
+		results = [ ]
+		for commandname in commands:
+			result = self._startup(commandname)
+			results.append(result)
+			print("%-36s %7.1f ms wall, %7.1f ms in %3d imports" % ("startup/" + result["command"], result["wall_time"] * 1000, result["import_time"] * 1000, result["modules"]))
+			if self._args.verbose >= 1:
+				for module in result["slowest"]:
+					print("%-36s %7.1f ms %s" % ("", module["self_time"] * 1000, module["module"]))
+		return results
+
+	def _run_suite(self, benchmark, suite):
+		results = [ ]
+		for result in benchmark.run(suite):
+			results.append(result)
+			line = "%-36s %12.0f %s/s" % (result["name"], result["throughput"], result["unit"])
+			if "peak_memory" in result:
+				line += ", peak %.0f KiB" % (result["peak_memory"] / 1024)
+			print(line)
+		return results
+
+	@staticmethod
+	def _metrics(output):
+		# Maps every measurement onto a value for which larger is better
+		metrics = { }
+		for result in output.get("startup", [ ]):
+			metrics["startup/" + result["command"]] = 1 / result["wall_time"]
+		for result in output.get("benchmarks", [ ]):
+			metrics[result["name"]] = result["throughput"]
+		return metrics
+
+	def _compare(self, output):
+		with open(self._args.baseline) as f:
+			baseline = self._metrics(json.load(f))
+		current = self._metrics(output)
+		regressions = 0
+		print()
+		print("Comparison against %s:" % (self._args.baseline))
+		for (name, value) in current.items():
+			if name not in baseline:
+				continue
+			change = (value / baseline[name] - 1) * 100
+			regression = change < -self._args.tolerance
+			regressions += int(regression)
+			print("%-36s %+7.1f%%%s" % (name, change, "  REGRESSION" if regression else ""))
+		print("%d regression(s) beyond %.0f%%." % (regressions, self._args.tolerance))
+		return regressions
+
+	def run(self):
+		suites = self._args.suite or ([ "startup" ] + Benchmark.SUITES)
+		output = { }
+		if "startup" in suites:
+			output["startup"] = self._run_startup()
+		benchmark = Benchmark(word_count = self._args.words, seed = self._args.seed, repeat = self._args.repeat, measure_memory = not self._args.no_memory)
+		output["benchmarks"] = [ ]
+		for suite in Benchmark.SUITES:
+			if suite in suites:
+				output["benchmarks"] += self._run_suite(benchmark, suite)
+
+		if self._args.output is not None:
+			with open(self._args.output, "w") as f:
+				json.dump(output, f, indent = 4)
+				f.write("\n")
+		if (self._args.baseline is not None) and (self._compare(output) > 0):
+			# Signal the regression to scripts that run the benchmark
+			sys.exit(1)
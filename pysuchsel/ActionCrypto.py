@@ -18,6 +18,7 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import random
 from .BaseAction import BaseAction
 from .CryptoPuzzle import CryptoPuzzle
 from .Tools import Tools
@@ -27,7 +28,11 @@ class ActionCrypto(BaseAction):
 		if len(self._args.alphabet) == 0:
 			raise Exception("No alphabet given on command line.")
 		plain_lines = Tools.read_file(self._args.infile)
-		cp = CryptoPuzzle(plain_lines = plain_lines, alphabet_names = self._args.alphabet, reveal_letters = self._args.reveal, crypto_solution = self._args.solution_word)
+		if self._cache_lookup(plain_lines):
+			return
+
+		cp = CryptoPuzzle(plain_lines = plain_lines, alphabet_names = self._args.alphabet, reveal_letters = self._args.reveal, crypto_solution = self._args.solution_word, rng = random.Random(self._args.seed))
 		if self._args.verbose >= 1:
 			cp.dump()
-		cp.write_svg(self._args.outfile)
+		cp.write_svg(self._args.outfile, compact = self._args.compact_svg)
+		self._cache_store([ ])
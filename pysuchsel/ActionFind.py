@@ -0,0 +1,50 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+from .BaseAction import BaseAction
+from .WordSearch import WordSearch
+from .Tools import Tools
+
+class ActionFind(BaseAction):
+	def _read_grid(self):
+		with open(self._args.gridfile) as f:
+			rows = [ "".join(line.split()).upper() for line in f ]
+		return [ row for row in rows if row != "" ]
+
+	def run(self):
+		rows = self._read_grid()
+		search = WordSearch(Tools.read_file(self._args.infile), rules = self._args.placement or None)
+		occurrences = collections.defaultdict(list)
+		for occurrence in search.find(rows):
+			occurrences[occurrence.word].append(occurrence)
+		if self._args.verbose >= 1:
+			print("Searched %d words in a %dx%d grid, found %d." % (len(search.words), max((len(row) for row in rows), default = 0), len(rows), len(occurrences)))
+
+		for word in search.words:
+			if len(occurrences[word]) == 0:
+				if not self._args.duplicates:
+					print("%s: not found" % (word))
+				continue
+			if self._args.duplicates and (len(occurrences[word]) < 2):
+				continue
+			for occurrence in occurrences[word]:
+				# Coordinates are given 1-based, as they are counted by readers
+				print("%s: column %d, row %d, %s" % (word, occurrence.x + 1, occurrence.y + 1, occurrence.rule))
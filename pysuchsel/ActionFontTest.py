@@ -18,25 +18,24 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-import json
-import pkgutil
-from pysvgedit import SVGDocument, SVGRect, Vector2D, Convenience as svgc
 from .BaseAction import BaseAction
+from .SVGStreamWriter import SVGStreamWriter
+from .Definitions import Definitions
 
 class ActionFontTest(BaseAction):
-	def run(self):
-		svg = SVGDocument.new()
-		crypto = json.loads(pkgutil.get_data("pysuchsel", "definitions.json"))["crypto"]
+	def _render_svg(self, svg):
+		crypto = Definitions.crypto_alphabets()
 		size = 20
 		for (y, (name, alphabets)) in enumerate(crypto.items()):
-			svgc.text(svg, text = name, x = -100, y = size * y, width = 90, height = size, halign = "right")
+			svg.text(-100, size * y, 90, size, name, halign = "right")
 			alphabet = "".join(alphabets)
 			if self._args.sort:
 				alphabet = sorted(set(alphabet))
 
 			yshift = 4
 			for (x, letter) in enumerate(alphabet):
-				svg.add(SVGRect.new(pos = Vector2D(size * x, size * y), extents = Vector2D(size, size)))
-				svgc.text(svg, text = letter, x = size * x, y = size * y + yshift, width = size, height = size - yshift, halign = "center")
-		svgc.autosize(svg)
-		svg.writefile(self._args.outfile)
+				svg.rect(size * x, size * y, size, size)
+				svg.text(size * x, size * y + yshift, size, size - yshift, letter)
+
+	def run(self):
+		SVGStreamWriter.render(self._args.outfile, self._render_svg, compact = self._args.compact_svg)
@@ -0,0 +1,264 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import json
+import time
+import signal
+import asyncio
+import concurrent.futures
+from .BaseAction import BaseAction
+
+def _generate_puzzle(command, params):
+	# Runs in a worker process of the pool
+	import pysuchsel
+	from .Exceptions import PuzzleNotSolvableException
+	params = dict(params)
+	compact = bool(params.pop("compact", False))
+	try:
+		if command in [ "suchsel", "crossword" ]:
+			generate = pysuchsel.generate_suchsel if (command == "suchsel") else pysuchsel.generate_crossword
+			result = generate(params.pop("words"), **params)
+			info = {
+				"seed":			result.seed,
+				"unplaced":		result.unplaced,
+				"blacklisted_cells":	result.blacklisted_cells,
+				"placements":	[ { "word": placement.word, "rule": placement.rule, "x": placement.x, "y": placement.y, "marker": placement.marker } for placement in result.placements ],
+			}
+			return (200, info, result.svg(compact = compact))
+		elif command == "crypto":
+			puzzle = pysuchsel.generate_crypto(params.pop("lines"), **params)
+			return (200, { }, puzzle.svg(compact = compact))
+		elif command == "solword":
+			puzzle = pysuchsel.generate_solution_word(params.pop("words"), **params)
+			return (200, { "solution": puzzle.solution }, puzzle.svg(compact = compact))
+	except PuzzleNotSolvableException as e:
+		return (422, { "error": str(e) }, None)
+	except (KeyError, TypeError, ValueError, NotImplementedError) as e:
+		return (400, { "error": "%s: %s" % (e.__class__.__name__, str(e)) }, None)
+	return (404, { "error": "No such command: %s" % (command) }, None)
+
+class HTTPError(Exception):
+	def __init__(self, status, message):
+		super().__init__(message)
+		self.status = status
+
+class ActionServe(BaseAction):
+	_COMMANDS = [ "suchsel", "crossword", "crypto", "solword" ]
+	_REASONS = {
+		200:	"OK",
+		400:	"Bad Request",
+		404:	"Not Found",
+		405:	"Method Not Allowed",
+		413:	"Payload Too Large",
+		422:	"Unprocessable Entity",
+		500:	"Internal Server Error",
+		503:	"Service Unavailable",
+		504:	"Gateway Timeout",
+	}
+	# Parameters accepted for every command. Options that only make sense on
+	# the command line (e.g., "jobs", which would spawn processes from within
+	# the pool workers, or "stats") are not accepted.
+	_GENERATOR_PARAMS = set([ "words", "seed", "compact", "width", "height", "placement", "contiguous", "engine", "place_attempts", "creation_attempts", "search_nodes", "search_timeout", "grid_backend", "keep_best", "fill_rule", "uniform_distribution", "shuffle", "auto_size", "aspect_ratio", "blacklist", "pack", "target_fill", "max_words" ])
+	_PARAMS = {
+		"suchsel":		_GENERATOR_PARAMS,
+		"crossword":	_GENERATOR_PARAMS,
+		"crypto":		set([ "lines", "alphabets", "reveal", "solution_word", "seed", "compact" ]),
+		"solword":		set([ "words", "solution_word", "attempts", "seed", "compact" ]),
+	}
+	# Upper limits of numeric parameters so that a single request cannot
+	# occupy a worker for long
+	_LIMITS = {
+		"width":				500,
+		"height":				500,
+		"place_attempts":		10000,
+		"creation_attempts":	100,
+		"search_nodes":			1000000,
+		"max_words":			10000,
+		"attempts":				10000,
+	}
+	# Parameters that are lists of strings. A single string would otherwise
+	# be taken as a list of its letters.
+	_STRING_LISTS = [ "words", "lines", "placement", "blacklist", "alphabets" ]
+	_CHUNK_SIZE = 64 * 1024
+
+	async def _read_request(self, reader):
+		request_line = (await reader.readline()).decode("latin1").rstrip("\r\n")
+		parts = request_line.split(" ")
+		if len(parts) != 3:
+			raise HTTPError(400, "Malformed request line.")
+		(method, path, _) = parts
+		headers = { }
+		while True:
+			line = (await reader.readline()).decode("latin1").rstrip("\r\n")
+			if line == "":
+				break
+			(key, _, value) = line.partition(":")
+			headers[key.strip().lower()] = value.strip()
+		length = int(headers.get("content-length", "0"))
+		if length > self._args.max_request_size:
+			raise HTTPError(413, "Request exceeds %d bytes." % (self._args.max_request_size))
+		body = await reader.readexactly(length) if (length > 0) else b""
+		return (method, path, body)
+
+	async def _respond(self, writer, status, body, content_type = "application/json", headers = None):
+		if not isinstance(body, bytes):
+			body = (json.dumps(body) + "\n").encode("utf-8")
+		head = [ "HTTP/1.1 %d %s" % (status, self._REASONS.get(status, "")), "Content-Type: %s" % (content_type), "Content-Length: %d" % (len(body)), "Connection: close" ]
+		for (key, value) in (headers or { }).items():
+			head.append("%s: %s" % (key, value))
+		writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin1"))
+		# Large documents are written piecewise so that slow clients exert
+		# backpressure on the server instead of buffering everything
+		for offset in range(0, len(body), self._CHUNK_SIZE):
+			writer.write(body[offset : offset + self._CHUNK_SIZE])
+			await writer.drain()
+		await writer.drain()
+
+	def _parse_params(self, command, body):
+		try:
+			params = json.loads(body.decode("utf-8"))
+		except (UnicodeDecodeError, ValueError) as e:
+			raise HTTPError(400, "Request body is not valid JSON: %s" % (str(e)))
+		if not isinstance(params, dict):
+			raise HTTPError(400, "Request body must be a JSON object.")
+		unknown = set(params) - self._PARAMS[command]
+		if len(unknown) > 0:
+			raise HTTPError(400, "Parameter(s) not allowed: %s" % (", ".join(sorted(unknown))))
+		for (name, limit) in self._LIMITS.items():
+			if name in params:
+				if (not isinstance(params[name], int)) or isinstance(params[name], bool) or not (0 <= params[name] <= limit):
+					raise HTTPError(400, "Parameter %s must be an integer between 0 and %d." % (name, limit))
+		for name in self._STRING_LISTS:
+			if name in params:
+				if (not isinstance(params[name], list)) or (not all(isinstance(item, str) for item in params[name])):
+					raise HTTPError(400, "Parameter %s must be a list of strings." % (name))
+		if command in [ "suchsel", "crossword" ]:
+			# Automatically sized grids are subject to the same limits as
+			# explicitly sized ones
+			params["max_size"] = min(self._LIMITS["width"], self._LIMITS["height"])
+			# A worker cannot be interrupted once it has started, so the
+			# backtracking search is limited to the request timeout instead
+			params.setdefault("search_timeout", self._args.timeout)
+			if (not isinstance(params["search_timeout"], (int, float))) or not (0 < params["search_timeout"] <= self._args.timeout):
+				raise HTTPError(400, "Parameter search_timeout must be a number of seconds up to %.1f." % (self._args.timeout))
+		return params
+
+	async def _generate(self, command, params):
+		# Requests wait for one of the concurrency slots; if too many are
+		# already waiting, the request is rejected immediately. The timeout
+		# includes the time spent waiting.
+		loop = asyncio.get_running_loop()
+		t_end = loop.time() + self._args.timeout
+		if self._waiting >= self._args.queue_size:
+			raise HTTPError(503, "Server busy, %d requests queued." % (self._waiting))
+		self._waiting += 1
+		try:
+			await asyncio.wait_for(self._slots.acquire(), timeout = self._args.timeout)
+		except asyncio.TimeoutError:
+			raise HTTPError(504, "No worker became available within %.1f seconds." % (self._args.timeout))
+		finally:
+			self._waiting -= 1
+		self._stats["active"] += 1
+		remaining = t_end - loop.time()
+		if "search_timeout" in params:
+			# The search may only use the time that is left
+			params["search_timeout"] = max(0.001, min(params["search_timeout"], remaining))
+		try:
+			future = loop.run_in_executor(self._pool, _generate_puzzle, command, params)
+		except BaseException:
+			self._finished(None)
+			raise
+
+		# A worker keeps running after the request timed out, so its slot is
+		# only released once it has actually finished. Otherwise, further
+		# requests would queue up in the pool behind it.
+		future.add_done_callback(self._finished)
+		try:
+			return await asyncio.wait_for(asyncio.shield(future), timeout = max(0, remaining))
+		except asyncio.TimeoutError:
+			raise HTTPError(504, "Generation did not finish within %.1f seconds." % (self._args.timeout))
+
+	def _finished(self, future):
+		if (future is not None) and (not future.cancelled()):
+			# Marks the exception of an abandoned request as retrieved
+			future.exception()
+		self._stats["active"] -= 1
+		self._slots.release()
+
+	async def _handle(self, reader, writer):
+		t0 = time.time()
+		status = 500
+		try:
+			try:
+				(method, path, body) = await asyncio.wait_for(self._read_request(reader), timeout = self._args.timeout)
+				command = path.strip("/")
+				if (method == "GET") and (command == "status"):
+					status = 200
+					await self._respond(writer, status, dict(self._stats, waiting = self._waiting))
+				elif command not in self._COMMANDS:
+					raise HTTPError(404, "No such command: %s" % (command))
+				elif method != "POST":
+					raise HTTPError(405, "Puzzles are requested by POST.")
+				else:
+					(status, info, svg_data) = await self._generate(command, self._parse_params(command, body))
+					if svg_data is None:
+						await self._respond(writer, status, info)
+					else:
+						await self._respond(writer, status, svg_data, content_type = "image/svg+xml", headers = { "X-Pysuchsel-Info": json.dumps(info) })
+			except HTTPError as e:
+				status = e.status
+				await self._respond(writer, status, { "error": str(e) }, headers = { "Retry-After": "1" } if (status == 503) else None)
+			except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+				status = 400
+				await self._respond(writer, status, { "error": "Incomplete or malformed request." })
+			except ConnectionError:
+				raise
+			except Exception as e:
+				status = 500
+				await self._respond(writer, status, { "error": "%s: %s" % (e.__class__.__name__, str(e)) })
+		except ConnectionError:
+			pass
+		finally:
+			self._stats["requests"] += 1
+			self._stats["status"][str(status)] = self._stats["status"].get(str(status), 0) + 1
+			if self._args.verbose >= 1:
+				print("%3d %8.3fs" % (status, time.time() - t0))
+			writer.close()
+
+	async def _serve(self):
+		self._slots = asyncio.Semaphore(self._args.jobs)
+		self._waiting = 0
+		self._stats = { "requests": 0, "active": 0, "status": { } }
+		if self._args.unix is not None:
+			server = await asyncio.start_unix_server(self._handle, path = self._args.unix)
+			print("Serving on unix:%s" % (self._args.unix))
+		else:
+			server = await asyncio.start_server(self._handle, host = self._args.bind, port = self._args.port)
+			print("Serving on http://%s:%d" % (self._args.bind, server.sockets[0].getsockname()[1]))
+		loop = asyncio.get_running_loop()
+		stop = loop.create_future()
+		for signum in [ signal.SIGINT, signal.SIGTERM ]:
+			loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+		async with server:
+			await stop
+
+	def run(self):
+		with concurrent.futures.ProcessPoolExecutor(max_workers = self._args.jobs) as self._pool:
+			asyncio.run(self._serve())
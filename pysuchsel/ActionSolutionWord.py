@@ -18,6 +18,7 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import random
 from .BaseAction import BaseAction
 from .SolutionWordPuzzle import SolutionWordPuzzle, PuzzleNotSolvableException
 from .Tools import Tools
@@ -25,7 +26,10 @@ from .Tools import Tools
 class ActionSolutionWord(BaseAction):
 	def run(self):
 		word_list = Tools.read_file(self._args.infile)
-		swp = SolutionWordPuzzle(word_list = word_list, solution_word = self._args.solword)
+		if self._cache_lookup(word_list):
+			return 0
+
+		swp = SolutionWordPuzzle(word_list = word_list, solution_word = self._args.solword, rng = random.Random(self._args.seed))
 		solution = None
 		for i in range(self._args.place_attempts):
 			try:
@@ -42,5 +46,6 @@ class ActionSolutionWord(BaseAction):
 			for (word_no, (word, letter_index)) in enumerate(solution, 1):
 				word_indent = " " * (indent - letter_index)
 				print("%2d %s%s" % (word_no, word_indent, word))
-		swp.write_svg(self._args.outfile)
+		swp.write_svg(self._args.outfile, compact = self._args.compact_svg)
+		self._cache_store([ ])
 		return 0
@@ -18,64 +18,92 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import sys
+import json
+import random
+import contextlib
 from .BaseAction import BaseAction
-from .RandomDist import RandomDist
+from .PuzzleGenerator import PuzzleGenerator
 from .Suchsel import Suchsel
+from .PlacementStats import PlacementStats
 from .Tools import Tools
-from .Alphabet import Alphabet
+from .Exceptions import PuzzleNotSolvableException
 
 class ActionSuchselCrossword(BaseAction):
-	def _get_placement_rule(self):
-		if len(self._args.placement) == 0:
-			plcrule = RandomDist({
-				"lr":	1,
-				"tb":	1,
-			})
-		else:
-			plcrule = RandomDist({ name: 1 for name in self._args.placement })
-		return plcrule
+	def _read_words(self, seed):
+		max_length = self._args.max_length
+		if (self._args.sample is not None) and (not self._args.auto_size):
+			# Only sample words that can be placed in the grid at all
+			grid_max_length = Suchsel.max_word_length(self._args.width, self._args.height, self._args.placement or [ "lr", "tb" ])
+			if self._cmd == "crossword":
+				# Arrow and end marker fields
+				grid_max_length -= 2
+			max_length = grid_max_length if (max_length is None) else min(max_length, grid_max_length)
+		accept = Tools.word_filter(min_length = self._args.min_length, max_length = max_length, letters = self._args.allowed_letters)
+		if self._args.sample is None:
+			return Tools.read_file(self._args.infile, accept = accept)
+		return Tools.read_file(self._args.infile, accept = accept, sample = self._args.sample, rng = random.Random("sample:%d" % (seed)))
 
-	def _attempt_placement(self, plcrule):
-		self._unplaced_words = [ ]
-		self._placed_words = { }
-		next_id = 1
-		self._suchsel = Suchsel(self._args.width, self._args.height, plcrule, attempts = self._args.place_attempts, is_crossword = (self._cmd == "crossword"))
-		for word in self._words:
-			if self._cmd == "suchsel":
-				placed = self._suchsel.place(word, contiguous = self._args.contiguous)
-			elif self._cmd == "crossword":
-				placed = self._suchsel.place_crossword(word, crossword_marker = next_id)
-				if placed:
-					self._placed_words[next_id] = word
-					next_id += 1
-			else:
-				raise NotImplementedError(self._args.mode)
-			if not placed:
-				self._unplaced_words.append(word)
-		return len(self._unplaced_words) == 0
+	def _check_args(self):
+		if self._args.pack and ((self._cmd == "crossword") or self._args.auto_size):
+			print("Error: --pack is only available for Suchsel puzzles and cannot be combined with --auto-size.", file = sys.stderr)
+			sys.exit(1)
+		if (not self._args.pack) and ((self._args.target_fill is not None) or (self._args.max_words is not None)):
+			print("Error: --target-fill and --max-words can only be used together with --pack.", file = sys.stderr)
+			sys.exit(1)
 
 	def run(self):
-		self._words = Tools.read_file(self._args.infile, shuffle = True)
-		plcrule = self._get_placement_rule()
+		self._check_args()
+		seed = self._args.seed if (self._args.seed is not None) else random.randrange(2 ** 32)
+
+		# Statistics are about creating the puzzle, so a cached result is
+		# not used when they are requested
+		stats = PlacementStats() if self._args.stats else None
+		with stats.phase("read") if (stats is not None) else contextlib.nullcontext():
+			words = self._read_words(seed)
+			blacklist = Tools.read_file(self._args.blacklist) if (self._args.blacklist is not None) else None
+		# The blacklist is part of the input, not only its filename
+		if self._cache_lookup(words if (blacklist is None) else { "words": words, "blacklist": blacklist }, lookup = (stats is None)):
+			return
 
-		for creation_attempt in range(self._args.creation_attempts):
-			if self._attempt_placement(plcrule):
-				break
+		generator = PuzzleGenerator(words, width = self._args.width, height = self._args.height, placement = self._args.placement, crossword = (self._cmd == "crossword"), contiguous = self._args.contiguous, engine = self._args.engine, place_attempts = self._args.place_attempts, creation_attempts = self._args.creation_attempts, search_nodes = self._args.search_nodes, search_timeout = self._args.search_timeout, grid_backend = self._args.grid_backend, keep_best = self._args.keep_best, jobs = self._args.jobs, fill_rule = self._args.fill_rule, uniform_distribution = self._args.uniform_distribution, verbose = self._args.verbose, stats = stats, auto_size = self._args.auto_size, aspect_ratio = self._args.aspect_ratio, blacklist = blacklist, pack = self._args.pack, target_fill = self._args.target_fill, max_words = self._args.max_words)
+		try:
+			result = generator.generate(seed = seed)
+		except (ValueError, PuzzleNotSolvableException) as e:
+			# E.g., no grid of an acceptable size holds all words
+			print("Error: %s" % (str(e)), file = sys.stderr)
+			sys.exit(1)
 
-		for unplaced_word in self._unplaced_words:
-			print("Warning: could not place word \"%s\"." % (unplaced_word))
+		if self._args.pack:
+			# Most words of the pool are expected to remain unused
+			messages = [ "Packed %d of %d words, %.1f%% of the grid filled." % (len(result.placements), len(words), result.puzzle.letter_cells / (result.puzzle.width * result.puzzle.height) * 100) ]
+		else:
+			messages = [ "Warning: could not place word \"%s\"." % (unplaced_word) for unplaced_word in result.unplaced ]
+		if self._args.auto_size:
+			messages.append("Grid size: %dx%d" % (result.puzzle.width, result.puzzle.height))
+		if result.blacklisted_cells > 0:
+			messages.append("Warning: filler letters in %d cells could not avoid spelling a blacklisted word." % (result.blacklisted_cells))
+		if self._args.verify:
+			with stats.phase("verify") if (stats is not None) else contextlib.nullcontext():
+				duplicates = result.find_duplicates()
+			messages += [ "Warning: word \"%s\" also occurs at column %d, row %d (%s)." % (duplicate.word, duplicate.x + 1, duplicate.y + 1, duplicate.rule) for duplicate in duplicates ]
+		for message in messages:
+			print(message)
 
 		if self._args.verbose >= 1:
-			self._suchsel.dump()
+			result.puzzle.dump(result.solution)
 
-		if self._cmd == "suchsel":
-			filler = Alphabet(self._args.fill_rule, uniform_distribution = self._args.uniform_distribution)
-			self._suchsel.fill(filler)
-			if self._args.verbose >= 2:
-				self._suchsel.dump()
+		if (self._cmd == "suchsel") and (self._args.verbose >= 2):
+			result.puzzle.dump()
 
-		self._suchsel.write_svg(self._args.outfile)
+		with stats.phase("render") if (stats is not None) else contextlib.nullcontext():
+			result.write_svg(self._args.outfile, compact = self._args.compact_svg)
 
 		if self._cmd == "crossword":
-			for (word_id, word) in sorted(self._placed_words.items()):
-				print("%2d: %s" % (word_id, word))
+			for placement in sorted(result.placements, key = lambda placement: placement.marker):
+				messages.append("%2d: %s" % (placement.marker, placement.word))
+				print(messages[-1])
+		self._cache_store(messages)
+
+		if stats is not None:
+			print(json.dumps(stats.to_dict(), indent = 4))
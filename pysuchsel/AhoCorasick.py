@@ -0,0 +1,129 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+
+class AhoCorasick():
+	# Automaton that finds all occurrences of many patterns in a text in a
+	# single pass, regardless of the number of patterns. Patterns are
+	# identified by their index in the list they were given in; identical
+	# patterns are all reported.
+	def __init__(self, patterns):
+		self._patterns = list(patterns)
+		self._goto = [ { } ]
+		self._output = [ [ ] ]
+		self._depth = [ 0 ]
+		for (pattern_id, pattern) in enumerate(self._patterns):
+			state = 0
+			for char in pattern:
+				next_state = self._goto[state].get(char)
+				if next_state is None:
+					next_state = len(self._goto)
+					self._goto[state][char] = next_state
+					self._goto.append({ })
+					self._output.append([ ])
+					self._depth.append(self._depth[state] + 1)
+				state = next_state
+			self._output[state].append(pattern_id)
+		# Length of the longest pattern that ends in every state; patterns
+		# that end in the state itself are as long as the state is deep
+		self._match_length = [ depth if (len(output) > 0) else 0 for (depth, output) in zip(self._depth, self._output) ]
+		self._fail = self._compute_fail()
+		self._transitions = { }
+
+	def _compute_fail(self):
+		# Breadth-first, so the failure state of a state's parent is always
+		# known. States at depth one fail to the root. Every state also
+		# reports the patterns of its failure state, i.e., those that are
+		# suffixes of its own.
+		fail = [ 0 ] * len(self._goto)
+		queue = collections.deque(self._goto[0].values())
+		while len(queue) > 0:
+			state = queue.popleft()
+			for (char, next_state) in self._goto[state].items():
+				queue.append(next_state)
+				fallback = fail[state]
+				while (fallback != 0) and (char not in self._goto[fallback]):
+					fallback = fail[fallback]
+				fail[next_state] = self._goto[fallback].get(char, 0)
+				# Most states do not inherit any patterns, so no list is
+				# copied for them
+				inherited = self._output[fail[next_state]]
+				if self._match_length[next_state] == 0:
+					self._match_length[next_state] = self._match_length[fail[next_state]]
+				if len(inherited) > 0:
+					self._output[next_state] = self._output[next_state] + inherited
+		return fail
+
+	@property
+	def patterns(self):
+		return self._patterns
+
+	def step(self, state, char):
+		# Returns the state after reading one more character. Transitions
+		# are memoized, so states can be advanced independently of each
+		# other (e.g., to try out several characters) in constant time.
+		key = (state, char)
+		next_state = self._transitions.get(key)
+		if next_state is None:
+			while (state != 0) and (char not in self._goto[state]):
+				state = self._fail[state]
+			next_state = self._goto[state].get(char, 0)
+			self._transitions[key] = next_state
+		return next_state
+
+	def depth(self, state):
+		# Number of characters of the text that the state represents
+		return self._depth[state]
+
+	def match_length(self, state):
+		# Length of the longest pattern that ends in the state or 0 if no
+		# pattern ends there
+		return self._match_length[state]
+
+	def search(self, text):
+		# Yields (end, pattern_id) for every occurrence, where end is the
+		# index of the pattern's last character within the text
+		(goto, fail, output) = (self._goto, self._fail, self._output)
+		state = 0
+		for (position, char) in enumerate(text):
+			while (state != 0) and (char not in goto[state]):
+				state = fail[state]
+			state = goto[state].get(char, 0)
+			for pattern_id in output[state]:
+				yield (position, pattern_id)
+
+if __name__ == "__main__":
+	# Compares the automaton against a brute-force search on random texts
+	import random
+	rng = random.Random(1)
+	for trial in range(1000):
+		patterns = [ "".join(rng.choice("AB") for i in range(rng.randint(1, 4))) for pattern_no in range(rng.randint(1, 6)) ]
+		text = "".join(rng.choice("ABC") for i in range(rng.randint(0, 30)))
+		found = sorted(AhoCorasick(patterns).search(text))
+		expected = sorted((start + len(pattern) - 1, pattern_id) for (pattern_id, pattern) in enumerate(patterns) for start in range(len(text) - len(pattern) + 1) if text[start : start + len(pattern)] == pattern)
+		assert found == expected, (patterns, text, found, expected)
+		automaton = AhoCorasick(patterns)
+		state = 0
+		for (position, char) in enumerate(text):
+			state = automaton.step(state, char)
+			expected_length = max((len(pattern) for pattern in patterns if text[: position + 1].endswith(pattern)), default = 0)
+			assert automaton.match_length(state) == expected_length, (patterns, text, position)
+	print("%d random texts OK" % (trial + 1))
@@ -18,19 +18,18 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-import json
-import pkgutil
-from .RandomDist import RandomDist
+from .Definitions import Definitions
 
 class Alphabet():
-	def __init__(self, language, uniform_distribution = False):
-		distributions = json.loads(pkgutil.get_data("pysuchsel", "definitions.json"))["distributions"]
-		distribution = distributions[language]
+	def __init__(self, language, uniform_distribution = False, rng = None):
+		self._dist = Definitions.random_dist(language, uniform_distribution = uniform_distribution, rng = rng)
 
-		if uniform_distribution:
-			self._dist = RandomDist({ letter: 1 for letter in distribution.keys() })
-		else:
-			self._dist = RandomDist({ letter: round(10000 * probability) for (letter, probability) in distribution.items() })
+	@property
+	def letters(self):
+		return self._dist.keys
 
 	def get(self):
 		return self._dist.event()
+
+	def get_many(self, count):
+		return self._dist.events(count)
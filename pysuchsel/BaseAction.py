@@ -18,11 +18,36 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+from .ResultCache import ResultCache
+
 class BaseAction():
 	def __init__(self, cmdname, args):
 		self._cmd = cmdname
 		self._args = args
 		self.run()
 
+	def _cache_lookup(self, input_lines, lookup = True):
+		# Returns True if the output file could be restored from the result
+		# cache, in which case the cached messages have also been printed.
+		# Without lookup, the result is only stored afterwards.
+		self._cache = ResultCache.for_args(self._args)
+		if self._cache is None:
+			return False
+		self._cache_key = ResultCache.key(self._cmd, input_lines, self._args)
+		if not lookup:
+			return False
+		messages = self._cache.restore(self._cache_key, self._args.outfile)
+		if messages is None:
+			return False
+		if self._args.verbose >= 1:
+			print("Using cached result %s" % (self._cache_key))
+		for message in messages:
+			print(message)
+		return True
+
+	def _cache_store(self, messages):
+		if self._cache is not None:
+			self._cache.store(self._cache_key, self._args.outfile, messages)
+
 	def run(self):
 		raise NotImplementedError()
@@ -0,0 +1,238 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import math
+import time
+import random
+import string
+import tracemalloc
+from .RandomDist import RandomDist
+from .Suchsel import Suchsel
+from .Alphabet import Alphabet
+from .CryptoPuzzle import CryptoPuzzle
+from .SolutionWordPuzzle import SolutionWordPuzzle
+from .Definitions import Definitions
+from .WordSearch import WordSearch
+from .PoolPacker import PoolPacker
+from .Blacklist import Blacklist
+
+class Benchmark():
+	# Micro benchmarks of the building blocks of puzzle creation. All inputs
+	# are synthetic and created from a fixed seed, so results of different
+	# runs (and different versions of the code) are comparable. Every case
+	# returns the number of units (placements, cells, events, ...) it
+	# processed, from which the throughput is determined.
+	SUITES = [ "place", "crossword", "pack", "fill", "randomdist", "crypto", "svg", "verify" ]
+	_ALL_RULES = [ "lr", "tb", "rl", "bt", "dbr", "dtr", "dbl", "dtl" ]
+	_RULE_MIXES = {
+		"straight":		[ "lr", "tb" ],
+		"all":			_ALL_RULES,
+	}
+	# Grid area as a multiple of the total number of letters of all words
+	_DENSITIES = {
+		"sparse":		4,
+		"medium":		2,
+		"dense":		1.2,
+	}
+
+	def __init__(self, word_count = 200, seed = 1, repeat = 3, measure_memory = True):
+		self._word_count = word_count
+		self._seed = seed
+		self._repeat = repeat
+		self._measure_memory = measure_memory
+
+	def _words(self, count, min_length = 3, max_length = 10):
+		rng = random.Random(self._seed)
+		return [ "".join(rng.choice(string.ascii_uppercase) for i in range(rng.randint(min_length, max_length))) for word_no in range(count) ]
+
+	def _measure(self, name, unit, function):
+		best = None
+		for i in range(self._repeat):
+			t0 = time.perf_counter()
+			units = function()
+			elapsed = time.perf_counter() - t0
+			best = elapsed if (best is None) else min(best, elapsed)
+		result = {
+			"name":			name,
+			"unit":			unit,
+			"units":		units,
+			"time":			best,
+			"throughput":	units / best if (best > 0) else None,
+		}
+		if self._measure_memory:
+			# Tracing slows down execution considerably, so memory is measured
+			# in a separate run
+			tracemalloc.start()
+			try:
+				function()
+				result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+			finally:
+				tracemalloc.stop()
+		return result
+
+	@staticmethod
+	def _grid_size(words, density):
+		side = math.ceil(math.sqrt(sum(len(word) for word in words) * density))
+		return max(side, max(len(word) for word in words))
+
+	def _suchsel(self, side, rules, engine, is_crossword = False):
+		rng = random.Random(self._seed)
+		return Suchsel(side, side, RandomDist({ rule: 1 for rule in rules }, rng = rng), attempts = 500, is_crossword = is_crossword, engine = engine, rng = rng)
+
+	def _placed_suchsel(self, words, side):
+		suchsel = self._suchsel(side, self._ALL_RULES, "enumerate")
+		for word in words:
+			suchsel.place(word)
+		return suchsel
+
+	def suite_place(self):
+		words = self._words(self._word_count)
+		for (density_name, density) in self._DENSITIES.items():
+			side = self._grid_size(words, density)
+			for (mix_name, rules) in self._RULE_MIXES.items():
+				for engine in [ "random", "enumerate" ]:
+					def place():
+						suchsel = self._suchsel(side, rules, engine)
+						for word in words:
+							suchsel.place(word, contiguous = True)
+						return len(words)
+					yield self._measure("place/%s/%s/%s" % (engine, density_name, mix_name), "placements", place)
+
+	def suite_crossword(self):
+		words = self._words(self._word_count // 2, min_length = 4)
+		side = self._grid_size(words, self._DENSITIES["medium"])
+		for engine in [ "random", "enumerate" ]:
+			def place_crossword():
+				suchsel = self._suchsel(side, [ "lr", "tb" ], engine, is_crossword = True)
+				marker = 1
+				for word in words:
+					if suchsel.place_crossword(word, crossword_marker = marker):
+						marker += 1
+				return len(words)
+			yield self._measure("crossword/%s" % (engine), "placements", place_crossword)
+
+	def suite_pack(self):
+		# Pool of five times the number of words, packed into a square grid
+		# that holds about the letters of a quarter of them
+		pool = self._words(self._word_count * 5)
+		side = self._grid_size(pool[: self._word_count // 4], 1)
+		for (mix_name, rules) in self._RULE_MIXES.items():
+			def pack():
+				suchsel = self._suchsel(side, rules, "enumerate")
+				return len(PoolPacker(suchsel, pool, rules, rng = random.Random(self._seed)).run().placed)
+			yield self._measure("pack/%dx%d/%s" % (side, side, mix_name), "placements", pack)
+
+	def suite_fill(self):
+		for side in [ 20, 100 ]:
+			def fill():
+				suchsel = self._suchsel(side, [ "lr" ], "enumerate")
+				suchsel.fill(Alphabet("en", rng = random.Random(self._seed)))
+				return side * side
+			yield self._measure("fill/%dx%d" % (side, side), "cells", fill)
+
+		# Filling against a large blacklist includes building its automaton,
+		# but not placing the words
+		side = 100
+		suchsel = self._placed_suchsel(self._words(self._word_count), side)
+		snapshot = suchsel.snapshot()
+		blacklist_words = self._words(10000, min_length = 4, max_length = 8)
+		def fill_blacklist():
+			suchsel.restore(snapshot)
+			suchsel.fill(Alphabet("en", rng = random.Random(self._seed)), blacklist = Blacklist(blacklist_words))
+			return side * side
+		yield self._measure("fill/%dx%d/blacklist" % (side, side), "cells", fill_blacklist)
+
+	def suite_randomdist(self):
+		count = 100000
+		dist = Definitions.random_dist("en")
+		def event():
+			rng_dist = dist.with_rng(random.Random(self._seed))
+			for i in range(count):
+				rng_dist.event()
+			return count
+		yield self._measure("randomdist/event", "events", event)
+
+		def events():
+			dist.with_rng(random.Random(self._seed)).events(count)
+			return count
+		yield self._measure("randomdist/events", "events", events)
+
+	def _plain_lines(self):
+		rng = random.Random(self._seed)
+		words = self._words(50)
+		return [ " ".join(rng.choice(words) for word_no in range(6)) for line_no in range(10) ]
+
+	def suite_crypto(self):
+		count = 200
+		plain_lines = self._plain_lines()
+		alphabets = list(Definitions.crypto_alphabets())
+		def construct():
+			rng = random.Random(self._seed)
+			for i in range(count):
+				CryptoPuzzle(plain_lines = plain_lines, alphabet_names = alphabets, reveal_letters = "ERNSTL", rng = rng)
+			return count
+		yield self._measure("crypto/construct", "puzzles", construct)
+
+	def suite_svg(self):
+		words = self._words(self._word_count)
+		side = self._grid_size(words, self._DENSITIES["medium"])
+		suchsel = self._placed_suchsel(words, side)
+		suchsel.fill(Alphabet("en", rng = random.Random(self._seed)))
+
+		crossword_words = self._words(self._word_count // 2, min_length = 4)
+		crossword_side = self._grid_size(crossword_words, self._DENSITIES["medium"])
+		crossword = self._suchsel(crossword_side, [ "lr", "tb" ], "enumerate", is_crossword = True)
+		for (marker, word) in enumerate(crossword_words, 1):
+			crossword.place_crossword(word, crossword_marker = marker)
+
+		plain_lines = self._plain_lines()
+		crypto = CryptoPuzzle(plain_lines = plain_lines, alphabet_names = list(Definitions.crypto_alphabets()), reveal_letters = "ERNSTL", rng = random.Random(self._seed))
+		solution_word = SolutionWordPuzzle(word_list = words, solution_word = "".join(word[0] for word in words[:10]), rng = random.Random(self._seed))
+		solution_word.find_solution()
+
+		puzzles = {
+			"suchsel":		(suchsel, side * side),
+			"crossword":	(crossword, crossword_side * crossword_side),
+			"crypto":		(crypto, sum(len(line) for line in plain_lines)),
+			"solword":		(solution_word, sum(len(word) for (word, index) in solution_word.solution)),
+		}
+		for (name, (puzzle, cells)) in puzzles.items():
+			for compact in [ False, True ]:
+				def write_svg():
+					puzzle.write_svg(io.StringIO(), compact = compact)
+					return cells
+				yield self._measure("svg/%s%s" % (name, "/compact" if compact else ""), "cells", write_svg)
+
+	def suite_verify(self):
+		words = self._words(self._word_count)
+		medium_side = self._grid_size(words, self._DENSITIES["medium"])
+		for side in [ medium_side, max(medium_side, 100) ]:
+			suchsel = self._placed_suchsel(words, side)
+			suchsel.fill(Alphabet("en", rng = random.Random(self._seed)))
+			(rows, placements) = (suchsel.rows, suchsel.placements)
+			def find_duplicates():
+				WordSearch(placement.word for placement in placements).find_duplicates(rows, placements)
+				return side * side
+			yield self._measure("verify/%dx%d" % (side, side), "cells", find_duplicates)
+
+	def run(self, suite):
+		# Yields the results of all cases of the suite as they finish
+		return getattr(self, "suite_" + suite)()
@@ -0,0 +1,37 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .AhoCorasick import AhoCorasick
+
+class Blacklist():
+	# Words that filler letters must not spell in any direction. The words
+	# and their reversed spellings are matched, so reading every line in axis
+	# direction finds all of them.
+	def __init__(self, words):
+		self._words = sorted(set(word.upper() for word in words))
+		self._automaton = AhoCorasick(self._words + [ word[::-1] for word in self._words ])
+
+	@property
+	def words(self):
+		return self._words
+
+	@property
+	def automaton(self):
+		return self._automaton
@@ -0,0 +1,88 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import json
+import pkgutil
+from .RandomDist import RandomDist
+
+class Definitions():
+	# Process-wide registry of letter distributions and crypto alphabets. The
+	# packaged definitions.json is parsed once on first use; further
+	# languages and alphabets can be registered at runtime.
+	_distributions = None
+	_crypto = None
+	_random_dists = { }
+	_crypto_chars = { }
+
+	@classmethod
+	def _load(cls):
+		if cls._distributions is None:
+			definitions = json.loads(pkgutil.get_data("pysuchsel", "definitions.json"))
+			cls._distributions = definitions["distributions"]
+			cls._crypto = definitions["crypto"]
+
+	@classmethod
+	def languages(cls):
+		cls._load()
+		return list(cls._distributions.keys())
+
+	@classmethod
+	def distribution(cls, language):
+		cls._load()
+		return cls._distributions[language]
+
+	@classmethod
+	def random_dist(cls, language, uniform_distribution = False, rng = None):
+		# The cumulative tables are built once per language; the returned
+		# RandomDist only differs in its random number generator.
+		key = (language, uniform_distribution)
+		if key not in cls._random_dists:
+			distribution = cls.distribution(language)
+			if uniform_distribution:
+				cls._random_dists[key] = RandomDist({ letter: 1 for letter in distribution.keys() })
+			else:
+				cls._random_dists[key] = RandomDist({ letter: round(10000 * probability) for (letter, probability) in distribution.items() })
+		return cls._random_dists[key].with_rng(rng)
+
+	@classmethod
+	def register_language(cls, language, distribution):
+		cls._load()
+		cls._distributions[language] = dict(distribution)
+		cls._random_dists.pop((language, False), None)
+		cls._random_dists.pop((language, True), None)
+
+	@classmethod
+	def crypto_alphabets(cls):
+		cls._load()
+		return dict(cls._crypto)
+
+	@classmethod
+	def crypto_chars(cls, alphabet_name):
+		if alphabet_name not in cls._crypto_chars:
+			cls._load()
+			cls._crypto_chars[alphabet_name] = frozenset("".join(cls._crypto[alphabet_name]))
+		return cls._crypto_chars[alphabet_name]
+
+	@classmethod
+	def register_crypto_alphabet(cls, alphabet_name, alphabets):
+		cls._load()
+		cls._crypto[alphabet_name] = list(alphabets)
+		cls._crypto_chars.pop(alphabet_name, None)
@@ -0,0 +1,212 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import array
+
+class VoidPlaceholder():
+	def __eq__(self, other):
+		return other.__class__ == self.__class__
+
+	def __neq__(self, other):
+		return not (self == other)
+
+	def __str__(self):
+		return "."
+
+class ArrowMarker():
+	def __init__(self, marking, direction):
+		self._marking = marking
+		self._direction = direction
+
+	@property
+	def marking(self):
+		return self._marking
+
+	def __str__(self):
+		return {
+			"left":		"<",
+			"right":	">",
+			"down":		"v",
+		}.get(self._direction, "?")
+
+class Grid():
+	# Cells are compared by integer codes. Letters are encoded by their
+	# codepoint, which is always larger than any of the special codes.
+	EMPTY = 0
+	VOID = 1
+	ARROW = 2
+
+	def __init__(self, width, height):
+		self._width = width
+		self._height = height
+		self._occupied = 0
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@classmethod
+	def encode(cls, content):
+		if content is None:
+			return cls.EMPTY
+		elif isinstance(content, str):
+			return ord(content)
+		elif isinstance(content, VoidPlaceholder):
+			return cls.VOID
+		elif isinstance(content, ArrowMarker):
+			return cls.ARROW
+		else:
+			raise NotImplementedError(content)
+
+	@classmethod
+	def is_letter(cls, code):
+		return code > cls.ARROW
+
+	def index(self, x, y):
+		return x + (y * self._width)
+
+	def in_bounds(self, x, y):
+		return (0 <= x < self._width) and (0 <= y < self._height)
+
+	def code(self, x, y):
+		raise NotImplementedError()
+
+	def codes(self, indices):
+		raise NotImplementedError()
+
+	def get(self, x, y):
+		raise NotImplementedError()
+
+	def set(self, x, y, content):
+		raise NotImplementedError()
+
+	def set_at(self, index, content):
+		(y, x) = divmod(index, self._width)
+		self.set(x, y, content)
+
+	def empty_indices(self):
+		return [ index for (index, code) in enumerate(self.codes(range(self._width * self._height))) if code == self.EMPTY ]
+
+	def set_letters(self, indices, letters):
+		# All given cells must be empty
+		for (index, letter) in zip(indices, letters):
+			self.set_at(index, letter)
+
+	def snapshot(self):
+		raise NotImplementedError()
+
+	def restore(self, snapshot):
+		raise NotImplementedError()
+
+	def __len__(self):
+		return self._occupied
+
+class DictGrid(Grid):
+	def __init__(self, width, height):
+		super().__init__(width, height)
+		self._cells = { }
+
+	def code(self, x, y):
+		return self.encode(self._cells.get((x, y)))
+
+	def codes(self, indices):
+		width = self._width
+		return [ self.encode(self._cells.get((index % width, index // width))) for index in indices ]
+
+	def get(self, x, y):
+		return self._cells.get((x, y))
+
+	def set(self, x, y, content):
+		if (x, y) not in self._cells:
+			self._occupied += 1
+		self._cells[(x, y)] = content
+
+	def snapshot(self):
+		return (dict(self._cells), self._occupied)
+
+	def restore(self, snapshot):
+		(cells, self._occupied) = snapshot
+		self._cells = dict(cells)
+
+class ArrayGrid(Grid):
+	def __init__(self, width, height):
+		super().__init__(width, height)
+		self._cells = array.array("I", bytes(4 * width * height))
+		self._arrows = { }
+
+	@property
+	def cells(self):
+		return self._cells
+
+	def code(self, x, y):
+		if (0 <= x < self._width) and (0 <= y < self._height):
+			return self._cells[x + (y * self._width)]
+		return self.EMPTY
+
+	def codes(self, indices):
+		cells = self._cells
+		return [ cells[index] for index in indices ]
+
+	def get(self, x, y):
+		if not self.in_bounds(x, y):
+			return None
+		index = x + (y * self._width)
+		code = self._cells[index]
+		if code == self.EMPTY:
+			return None
+		elif code == self.VOID:
+			return VoidPlaceholder()
+		elif code == self.ARROW:
+			return self._arrows[index]
+		else:
+			return chr(code)
+
+	def set(self, x, y, content):
+		self.set_at(x + (y * self._width), content)
+
+	def empty_indices(self):
+		return [ index for (index, code) in enumerate(self._cells) if code == self.EMPTY ]
+
+	def set_letters(self, indices, letters):
+		cells = self._cells
+		for (index, letter) in zip(indices, letters):
+			cells[index] = ord(letter)
+		self._occupied += len(indices)
+
+	def set_at(self, index, content):
+		code = self.encode(content)
+		if self._cells[index] == self.EMPTY:
+			self._occupied += 1
+		if code == self.ARROW:
+			self._arrows[index] = content
+		self._cells[index] = code
+
+	def snapshot(self):
+		return (array.array("I", self._cells), dict(self._arrows), self._occupied)
+
+	def restore(self, snapshot):
+		(cells, arrows, self._occupied) = snapshot
+		self._cells = array.array("I", cells)
+		self._arrows = dict(arrows)
@@ -24,6 +24,7 @@
 #	File UUID 4c6b89d0-ec0c-4b19-80d1-4daba7d80967
 
 import sys
+import importlib
 import collections
 import textwrap
 
@@ -106,18 +107,37 @@ class MultiCommand():
 			supplied_cmd = self._aliases[supplied_cmd]
 
 		command = self._commands[supplied_cmd]
+		parser = self.create_parser(command, silent = silent)
+		args = parser.parse_args(cmdline[1:])
+		return self.ParseResult(command, args)
+
+	def get_command(self, commandname):
+		commandname = self._aliases.get(commandname, commandname)
+		if commandname not in self._commands:
+			raise Exception("No such command: %s" % (commandname))
+		return self._commands[commandname]
+
+	def create_parser(self, command, silent = False):
 		parser = FriendlyArgumentParser(prog = sys.argv[0] + " " + command.name, description = command.description, add_help = False)
 		command.parsergenerator(parser)
 		parser.add_argument("--help", action = "help", help = "Show this help page.")
 		parser.setsilenterror(silent)
-		args = parser.parse_args(cmdline[1:])
-		return self.ParseResult(command, args)
+		return parser
+
+	def resolve_action(self, command):
+		# Actions may be given as "module:attribute" strings, in which case
+		# the module is only imported when the command is actually run.
+		if isinstance(command.action, str):
+			(module_name, attribute) = command.action.split(":")
+			return getattr(importlib.import_module(module_name), attribute)
+		return command.action
 
 	def run(self, cmdline, silent = False):
 		parseresult = self.parse(cmdline, silent)
 		if parseresult.cmd.action is None:
 			raise Exception("Should run command '%s', but no action was registered." % (parseresult.cmd.name))
-		parseresult.cmd.action(parseresult.cmd.name, parseresult.args)
+		action = self.resolve_action(parseresult.cmd)
+		action(parseresult.cmd.name, parseresult.args)
 
 if __name__ == "__main__":
 	mc = MultiCommand()
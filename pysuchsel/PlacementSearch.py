@@ -0,0 +1,192 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import time
+import random
+import collections
+
+class PlacementSearch():
+	# Bounded depth-first search over word placements. Words are ordered by
+	# how constrained they are, every word is tried at its candidate
+	# positions (most intersections first) and the search backtracks when a
+	# word cannot be placed. Skipping a word is always the last alternative,
+	# so complete solutions are found first. When the node or time budget is
+	# exhausted, the current partial solution is completed greedily and the
+	# best solution seen is returned.
+	Result = collections.namedtuple("Result", [ "placed", "unplaced", "nodes", "complete" ])
+
+	def __init__(self, suchsel, words, crossword = False, contiguous = False, max_nodes = 10000, timeout = None, branching = 8, rng = None):
+		self._suchsel = suchsel
+		self._words = self._order_words(words)
+		self._crossword = crossword
+		self._contiguous = contiguous
+		self._max_nodes = max_nodes
+		self._timeout = timeout
+		self._branching = branching
+		self._rng = rng if (rng is not None) else random
+		self._nodes = 0
+		self._t_end = None
+		self._best = None
+		self._aborted = False
+
+	@staticmethod
+	def _order_words(words):
+		# Longest words first, ties broken by how many letters they share with
+		# the other words of the set
+		letter_count = collections.Counter()
+		for word in words:
+			letter_count.update(set(word))
+		def overlap(word):
+			return sum(letter_count[letter] - 1 for letter in set(word))
+		return sorted(words, key = lambda word: (-len(word), -overlap(word)))
+
+	def _budget_exhausted(self):
+		if (self._max_nodes is not None) and (self._nodes >= self._max_nodes):
+			return True
+		if (self._t_end is not None) and (time.time() >= self._t_end):
+			return True
+		return False
+
+	def _candidates(self, word, marker):
+		with self._suchsel.word_stats(word):
+			return self._find_candidates(word, marker)
+
+	def _find_candidates(self, word, marker):
+		crossword_marker = marker if self._crossword else None
+		candidates = [ ]
+		if (self._suchsel.occupied > 0) and (self._crossword or self._contiguous):
+			candidates = self._suchsel.enumerate_candidates(word, crossword_marker = crossword_marker, anchored = True)
+			candidates = [ candidate for rule_candidates in candidates.values() for candidate in rule_candidates ]
+		if (len(candidates) == 0) and ((self._suchsel.occupied == 0) or not self._crossword):
+			candidates = self._suchsel.enumerate_candidates(word, crossword_marker = crossword_marker)
+			candidates = [ candidate for rule_candidates in candidates.values() for candidate in rule_candidates ]
+		self._rng.shuffle(candidates)
+		candidates.sort(key = lambda candidate: -candidate[2])
+		return candidates[:self._branching]
+
+	def _dead_words(self, index, grid_letters):
+		# In crossword mode, every word after the first needs to intersect
+		# another. A remaining word that shares no letter with the grid nor
+		# with any other remaining word can therefore never be placed.
+		if (not self._crossword) or (len(grid_letters) == 0):
+			return 0
+		remaining = self._words[index:]
+		remaining_letters = collections.Counter()
+		for word in remaining:
+			remaining_letters.update(set(word))
+		dead = 0
+		for word in remaining:
+			letters = set(word)
+			if any((letter in grid_letters) or (remaining_letters[letter] > 1) for letter in letters):
+				continue
+			dead += 1
+		return dead
+
+	def _record(self, placed, unplaced):
+		if (self._best is None) or (len(placed) > len(self._best[0])):
+			self._best = (list(placed), list(unplaced), self._suchsel.snapshot())
+
+	def _complete_greedily(self, index, placed, unplaced):
+		placed = list(placed)
+		unplaced = list(unplaced)
+		for word in self._words[index:]:
+			marker = len(placed) + 1
+			candidates = self._candidates(word, marker)
+			if len(candidates) == 0:
+				unplaced.append(word)
+			else:
+				self._suchsel.place_candidate(candidates[0])
+				placed.append((marker, word))
+		self._record(placed, unplaced)
+
+	def _search(self):
+		# Depth-first search with an explicit stack, since word lists can be
+		# much longer than the recursion limit. Every frame holds the index of
+		# its word, the grid letters and snapshot before the word and the
+		# remaining candidates (None once the word has been left out).
+		placed = [ ]
+		unplaced = [ ]
+		stack = [ ]
+		(index, grid_letters) = (0, frozenset())
+		while True:
+			# Enter the word at index unless the search is at a leaf or can be
+			# bounded: even placing all remaining live words cannot beat the
+			# best solution found so far
+			if index == len(self._words):
+				self._record(placed, unplaced)
+				if len(unplaced) == 0:
+					return True
+			elif (self._best is None) or (len(placed) + (len(self._words) - index) - self._dead_words(index, grid_letters) > len(self._best[0])):
+				snapshot = self._suchsel.snapshot()
+				candidates = self._candidates(self._words[index], len(placed) + 1)
+				stack.append([ index, grid_letters, snapshot, iter(candidates), False ])
+
+			# Continue with the next alternative of the innermost word that
+			# has one left
+			while len(stack) > 0:
+				frame = stack[-1]
+				(frame_index, frame_letters, snapshot, candidates, candidate_placed) = frame
+				word = self._words[frame_index]
+				if candidates is None:
+					# Leaving out the word did not lead to a solution either
+					unplaced.pop()
+					stack.pop()
+					continue
+
+				if candidate_placed:
+					placed.pop()
+					self._suchsel.restore(snapshot)
+					frame[4] = False
+				candidate = next(candidates, None) if not self._budget_exhausted() else None
+				if candidate is not None:
+					self._nodes += 1
+					self._suchsel.place_candidate(candidate)
+					placed.append((len(placed) + 1, word))
+					frame[4] = True
+					(index, grid_letters) = (frame_index + 1, frame_letters | set(word))
+					break
+
+				if self._budget_exhausted():
+					if not self._aborted:
+						self._aborted = True
+						self._complete_greedily(frame_index, placed, unplaced)
+						self._suchsel.restore(snapshot)
+					stack.pop()
+					continue
+
+				# Last alternative: leave the word out
+				unplaced.append(word)
+				frame[3] = None
+				(index, grid_letters) = (frame_index + 1, frame_letters)
+				break
+			else:
+				return False
+
+	def run(self):
+		self._nodes = 0
+		self._best = None
+		self._aborted = False
+		if self._timeout is not None:
+			self._t_end = time.time() + self._timeout
+		complete = self._search()
+		(placed, unplaced, snapshot) = self._best
+		self._suchsel.restore(snapshot)
+		return self.Result(placed = placed, unplaced = unplaced, nodes = self._nodes, complete = complete)
@@ -0,0 +1,101 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import time
+import contextlib
+
+class PlacementStats():
+	# Collects how often and why placements of each word are rejected and
+	# where the time is spent. Only created on request, so none of this costs
+	# anything during normal operation.
+	REASONS = [ "out_of_bounds", "letter_conflict", "adjacency", "non_contiguous" ]
+
+	def __init__(self):
+		self._words = { }
+		self._phases = { }
+		self._current = None
+		self._creation_attempts = 0
+
+	def _record(self, word):
+		if word not in self._words:
+			self._words[word] = {
+				"attempts":		0,
+				"rejections":	{ reason: 0 for reason in self.REASONS },
+				"time":			0,
+				"placed":		False,
+			}
+		return self._words[word]
+
+	@contextlib.contextmanager
+	def word(self, word):
+		# Attempts and rejections that occur within the context are
+		# accounted to the word
+		record = self._record(word)
+		(previous, self._current) = (self._current, record)
+		t0 = time.perf_counter()
+		try:
+			yield record
+		finally:
+			record["time"] += time.perf_counter() - t0
+			self._current = previous
+
+	@contextlib.contextmanager
+	def phase(self, name):
+		t0 = time.perf_counter()
+		try:
+			yield
+		finally:
+			self._phases[name] = self._phases.get(name, 0) + (time.perf_counter() - t0)
+
+	def attempt(self, count = 1):
+		if self._current is not None:
+			self._current["attempts"] += count
+
+	def reject(self, reason, count = 1):
+		if self._current is not None:
+			self._current["rejections"][reason] += count
+
+	def merge(self, other):
+		# Adds the statistics of one creation attempt
+		self._creation_attempts += 1
+		for (word, other_record) in other._words.items():
+			record = self._record(word)
+			record["attempts"] += other_record["attempts"]
+			record["time"] += other_record["time"]
+			for (reason, count) in other_record["rejections"].items():
+				record["rejections"][reason] += count
+
+	def set_unplaced(self, unplaced_words):
+		unplaced_words = set(unplaced_words)
+		for (word, record) in self._words.items():
+			record["placed"] = word not in unplaced_words
+
+	def to_dict(self):
+		totals = {
+			"attempts":		sum(record["attempts"] for record in self._words.values()),
+			"rejections":	{ reason: sum(record["rejections"][reason] for record in self._words.values()) for reason in self.REASONS },
+			"time":			sum(record["time"] for record in self._words.values()),
+		}
+		return {
+			"phases":				self._phases,
+			"creation_attempts":	self._creation_attempts,
+			"totals":				totals,
+			"words":				[ dict(word = word, **record) for (word, record) in self._words.items() ],
+		}
@@ -0,0 +1,173 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import heapq
+import random
+import collections
+
+class PoolPacker():
+	# Greedily fills the grid with words chosen from a pool that is usually
+	# much larger than what fits. In every step, the best placement of any
+	# pool word is chosen. Placements are scored by the letters they share
+	# with the grid, their length, how many occupied cells surround their new
+	# letters (i.e., how well they fill gaps) and how often their placement
+	# rule has been used already.
+	#
+	# All placements that overlap the grid are kept between steps. After a
+	# word is placed, only the placements through its new letters change:
+	# they either gain an overlap or conflict and are dropped, and placements
+	# anchored at the new letters are added. Placing letters can never make a
+	# placement valid that did not overlap the grid before, so a word that
+	# cannot be placed anywhere is dropped from the pool for good. Only when
+	# no overlapping placement is left, a word is placed freely.
+	Result = collections.namedtuple("Result", [ "placed", "unused", "fill_ratio", "complete" ])
+	_OVERLAP_WEIGHT = 4
+	_LENGTH_WEIGHT = 1
+	_DENSITY_WEIGHT = 1
+	_BALANCE_WEIGHT = 2
+	# Number of placements with the most overlaps that are fully scored
+	_SHORTLIST = 32
+
+	def __init__(self, suchsel, words, rules, target_fill = None, max_words = None, rng = None):
+		self._suchsel = suchsel
+		self._words = list(dict.fromkeys(words))
+		self._target_fill = target_fill
+		self._max_words = max_words
+		self._rng = rng if (rng is not None) else random
+		(width, height) = (suchsel.width, suchsel.height)
+		self._size = width * height
+		self._neighbours = [ tuple(nx + (ny * width) for (nx, ny) in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)) if (0 <= nx < width) and (0 <= ny < height)) for y in range(height) for x in range(width) ]
+		self._occupied = bytearray(self._size)
+		self._letter_cells = 0
+		self._rule_count = { rule: 0 for rule in rules }
+		self._live = [ ]
+		self._placed = [ ]
+
+		# Placements that overlap the grid: id -> (word, candidate) with the
+		# number of overlapping letters and indices by cell and by word
+		self._candidates = { }
+		self._overlaps = { }
+		self._keys = { }
+		self._by_cell = collections.defaultdict(set)
+		self._by_word = collections.defaultdict(set)
+		self._next_id = 0
+
+	def _target_reached(self):
+		if (self._max_words is not None) and (len(self._placed) >= self._max_words):
+			return True
+		if (self._target_fill is not None) and (self._letter_cells / self._size >= self._target_fill):
+			return True
+		return False
+
+	def _add_candidate(self, word, candidate):
+		(tword, cells, overlaps, rule) = candidate
+		key = (word, rule, cells[0])
+		if (key in self._keys) or (overlaps == len(cells)):
+			# Either known already or the word would not add a single letter
+			return
+		candidate_id = self._next_id
+		self._next_id += 1
+		self._keys[key] = candidate_id
+		self._candidates[candidate_id] = (word, candidate)
+		self._overlaps[candidate_id] = overlaps
+		self._by_word[word].add(candidate_id)
+		for index in cells:
+			self._by_cell[index].add(candidate_id)
+
+	def _remove_candidate(self, candidate_id):
+		(word, (tword, cells, _, rule)) = self._candidates.pop(candidate_id)
+		del self._overlaps[candidate_id]
+		del self._keys[(word, rule, cells[0])]
+		self._by_word[word].discard(candidate_id)
+		for index in cells:
+			self._by_cell[index].discard(candidate_id)
+
+	def _score(self, word, candidate, overlaps):
+		(tword, cells, _, rule) = candidate
+		own_cells = set(cells)
+		neighbours = sum(1 for index in cells if not self._occupied[index] for neighbour in self._neighbours[index] if self._occupied[neighbour] and (neighbour not in own_cells))
+		imbalance = self._rule_count[rule] - min(self._rule_count.values())
+		return (self._OVERLAP_WEIGHT * overlaps) + (self._LENGTH_WEIGHT * len(word)) + (self._DENSITY_WEIGHT * neighbours) - (self._BALANCE_WEIGHT * imbalance)
+
+	def _choose(self, scored):
+		# Best (score, word, candidate) tuple, ties are broken randomly
+		return max(scored, key = lambda entry: (entry[0], self._rng.random()), default = None)
+
+	def _best_overlapping(self):
+		shortlist = heapq.nlargest(self._SHORTLIST, self._candidates, key = lambda candidate_id: (self._overlaps[candidate_id], len(self._candidates[candidate_id][0])))
+		return self._choose((self._score(*self._candidates[candidate_id], self._overlaps[candidate_id]), ) + self._candidates[candidate_id] for candidate_id in shortlist)
+
+	def _best_free(self):
+		# Longest words first; those that cannot be placed anywhere are
+		# dropped from the pool
+		for word in sorted(self._live, key = len, reverse = True):
+			with self._suchsel.word_stats(word):
+				candidates = [ candidate for rule_candidates in self._suchsel.enumerate_candidates(word).values() for candidate in rule_candidates ]
+			if len(candidates) == 0:
+				self._live.remove(word)
+				continue
+			return self._choose((self._score(word, candidate, candidate[2]), word, candidate) for candidate in candidates)
+		return None
+
+	def _place(self, word, candidate):
+		(tword, cells, _, rule) = candidate
+		new_letters = [ (index, item) for (item, index) in zip(tword, cells) if not self._occupied[index] ]
+		self._suchsel.place_candidate(candidate)
+		self._placed.append(word)
+		self._live.remove(word)
+		self._rule_count[rule] += 1
+		for candidate_id in list(self._by_word.pop(word, ())):
+			self._remove_candidate(candidate_id)
+
+		for (index, letter) in new_letters:
+			self._occupied[index] = 1
+			self._letter_cells += 1
+			for candidate_id in list(self._by_cell[index]):
+				(other_tword, other_cells, _, _) = self._candidates[candidate_id][1]
+				if other_tword[other_cells.index(index)] != letter:
+					self._remove_candidate(candidate_id)
+				else:
+					self._overlaps[candidate_id] += 1
+					if self._overlaps[candidate_id] == len(other_cells):
+						self._remove_candidate(candidate_id)
+
+		# Only words that contain one of the new letters can be anchored there
+		anchors = [ index for (index, letter) in new_letters ]
+		letters = set(letter for (index, letter) in new_letters)
+		for other_word in self._live:
+			if letters.isdisjoint(other_word):
+				continue
+			with self._suchsel.word_stats(other_word):
+				for rule_candidates in self._suchsel.enumerate_candidates(other_word, anchored = True, anchors = anchors).values():
+					for other_candidate in rule_candidates:
+						self._add_candidate(other_word, other_candidate)
+
+	def run(self):
+		self._live = list(self._words)
+		self._rng.shuffle(self._live)
+		while (not self._target_reached()) and (len(self._live) > 0):
+			best = self._best_overlapping() or self._best_free()
+			if best is None:
+				break
+			(score, word, candidate) = best
+			self._place(word, candidate)
+		placed = set(self._placed)
+		unused = [ word for word in self._words if word not in placed ]
+		return self.Result(placed = list(self._placed), unused = unused, fill_ratio = self._letter_cells / self._size, complete = self._target_reached())
@@ -0,0 +1,309 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import random
+import contextlib
+from .RandomDist import RandomDist
+from .Suchsel import Suchsel
+from .PlacementSearch import PlacementSearch
+from .PoolPacker import PoolPacker
+from .Alphabet import Alphabet
+from .Blacklist import Blacklist
+from .PlacementStats import PlacementStats
+from .PuzzleResult import PuzzleResult
+from .Exceptions import PuzzleNotSolvableException
+
+class PuzzleGenerator():
+	# Creates Suchsel and crossword puzzles entirely in memory. Several
+	# creation attempts can be made (optionally in parallel processes), each
+	# with its own random stream derived from the seed.
+	#
+	# With auto_size, the smallest grid with the given aspect ratio (or that
+	# of width/height) that holds all words is searched. The grid never gets
+	# wider or taller than max_size.
+	#
+	# Filler letters never spell a word of the blacklist (in any direction)
+	# unless it is unavoidable.
+	#
+	# With pack, the words are a pool from which as many words as possible
+	# (or until target_fill or max_words is reached) are chosen; an attempt
+	# is complete when the target is reached. Otherwise, the attempt that
+	# fills the most cells is kept.
+	_MAX_GROWTH = 6
+	# Number of times every grid size is tried by auto_size, each time with
+	# another word order. A single random placement that fails does not mean
+	# that the words cannot fit.
+	_PROBE_ATTEMPTS = 8
+	def __init__(self, words, width = 15, height = 20, placement = None, crossword = False, contiguous = False, engine = "random", place_attempts = 500, creation_attempts = 1, search_nodes = 10000, search_timeout = None, grid_backend = "array", keep_best = False, jobs = 1, fill_rule = "en", uniform_distribution = False, shuffle = True, verbose = 0, stats = None, auto_size = False, aspect_ratio = None, max_size = 1000, blacklist = None, pack = False, target_fill = None, max_words = None):
+		self._input_words = [ word.upper() for word in words ]
+		self._words = None
+		self._width = width
+		self._height = height
+		self._placement = list(placement) if (placement is not None) else [ ]
+		self._crossword = crossword
+		self._contiguous = contiguous
+		self._engine = engine
+		self._place_attempts = place_attempts
+		self._creation_attempts = creation_attempts
+		self._search_nodes = search_nodes
+		self._search_timeout = search_timeout
+		self._grid_backend = grid_backend
+		self._keep_best = keep_best
+		self._jobs = jobs
+		self._fill_rule = fill_rule
+		self._uniform_distribution = uniform_distribution
+		self._shuffle = shuffle
+		self._verbose = verbose
+		self._stats = stats
+		self._auto_size = auto_size
+		self._aspect_ratio = aspect_ratio
+		if auto_size and not (((aspect_ratio is None) and (width > 0) and (height > 0)) or ((aspect_ratio is not None) and (aspect_ratio > 0))):
+			raise ValueError("Automatic sizing needs a positive aspect ratio (or width and height).")
+		self._max_size = max_size
+		self._blacklist = list(blacklist) if (blacklist is not None) else None
+		self._pack = pack
+		self._target_fill = target_fill
+		self._max_words = max_words
+		if pack and (crossword or auto_size):
+			raise ValueError("Packing words from a pool is only possible for Suchsel puzzles of a given size.")
+		if (not pack) and ((target_fill is not None) or (max_words is not None)):
+			raise ValueError("A target fill ratio or maximum number of words can only be given when packing.")
+
+	def _get_placement_rule(self, rng):
+		if len(self._placement) == 0:
+			plcrule = RandomDist({
+				"lr":	1,
+				"tb":	1,
+			}, rng = rng)
+		else:
+			plcrule = RandomDist({ name: 1 for name in self._placement }, rng = rng)
+		return plcrule
+
+	def _create_suchsel(self, rng, engine):
+		return Suchsel(self._width, self._height, self._get_placement_rule(rng), attempts = self._place_attempts, is_crossword = self._crossword, engine = engine, backend = self._grid_backend, rng = rng, stats = PlacementStats() if (self._stats is not None) else None)
+
+	def _attempt_search(self, rng):
+		self._suchsel = self._create_suchsel(rng, "enumerate")
+		search = PlacementSearch(self._suchsel, self._words, crossword = self._crossword, contiguous = self._contiguous, max_nodes = self._search_nodes, timeout = self._search_timeout, rng = rng)
+		result = search.run()
+		if self._verbose >= 1:
+			print("Search visited %d nodes, placed %d of %d words." % (result.nodes, len(result.placed), len(self._words)))
+		self._unplaced_words = result.unplaced
+		return result.complete
+
+	def _attempt_pack(self, rng):
+		self._suchsel = self._create_suchsel(rng, "enumerate")
+		packer = PoolPacker(self._suchsel, self._words, rules = self._placement or [ "lr", "tb" ], target_fill = self._target_fill, max_words = self._max_words, rng = rng)
+		result = packer.run()
+		self._unplaced_words = result.unused
+		return result.complete
+
+	def _attempt_placement(self, rng):
+		if self._pack:
+			return self._attempt_pack(rng)
+		if self._engine == "backtrack":
+			return self._attempt_search(rng)
+
+		self._unplaced_words = [ ]
+		next_id = 1
+		self._suchsel = self._create_suchsel(rng, self._engine)
+		for word in self._words:
+			if not self._crossword:
+				placed = self._suchsel.place(word, contiguous = self._contiguous)
+			else:
+				placed = self._suchsel.place_crossword(word, crossword_marker = next_id)
+				if placed:
+					next_id += 1
+			if not placed:
+				self._unplaced_words.append(word)
+		return len(self._unplaced_words) == 0
+
+	def _attempt_result(self):
+		# Results are compared by the number of placed words first and the
+		# number of overlapping letters second. When packing, most words of
+		# the pool remain unused anyway and the filled cells count instead.
+		placed_letters = sum(len(word) for word in self._words) - sum(len(word) for word in self._unplaced_words)
+		overlaps = placed_letters - self._suchsel.letter_cells
+		if self._pack:
+			score = (self._suchsel.letter_cells, -len(self._unplaced_words))
+		else:
+			score = (-len(self._unplaced_words), overlaps)
+		return (score, self._suchsel, self._unplaced_words)
+
+	def _seeded_attempt(self, seed):
+		# Every attempt has its own random stream so that the result does not
+		# depend on whether attempts run sequentially or in parallel
+		complete = self._attempt_placement(random.Random(seed))
+		return (complete, self._attempt_result())
+
+	def _choose_result(self, best, result):
+		if self._stats is not None:
+			self._stats.merge(result[1].stats)
+		if (best is None) or (not (self._keep_best or self._pack)) or (result[0] > best[0]):
+			return result
+		return best
+
+	def _run_sequential(self, seeds):
+		best = None
+		for seed in seeds:
+			(complete, result) = self._seeded_attempt(seed)
+			best = self._choose_result(best, result)
+			if complete:
+				break
+		return best
+
+	def _run_parallel(self, seeds):
+		# Results are consumed in order of the attempts (although they are
+		# computed concurrently) so that the outcome is reproducible
+		import multiprocessing
+		best = None
+		with multiprocessing.Pool(self._jobs) as pool:
+			for (complete, result) in pool.imap(self._seeded_attempt, seeds):
+				if complete:
+					best = self._choose_result(None, result)
+					break
+				best = self._choose_result(best, result)
+		# Leaving the context terminates all attempts that are still running
+		return best
+
+	def _phase(self, name):
+		return self._stats.phase(name) if (self._stats is not None) else contextlib.nullcontext()
+
+	def _place_words(self, seed):
+		rng = random.Random(seed)
+		self._words = list(self._input_words)
+		if self._shuffle:
+			rng.shuffle(self._words)
+		seeds = [ rng.randrange(2 ** 32) for creation_attempt in range(self._creation_attempts) ]
+
+		with self._phase("place"):
+			if (self._jobs > 1) and (self._creation_attempts > 1):
+				(_, suchsel, unplaced_words) = self._run_parallel(seeds)
+			else:
+				(_, suchsel, unplaced_words) = self._run_sequential(seeds)
+		return (rng, suchsel, unplaced_words)
+
+	@staticmethod
+	def _grid_size(height, aspect_ratio):
+		return (max(1, round(height * aspect_ratio)), height)
+
+	@staticmethod
+	def _smallest(predicate, low, high):
+		# Smallest value in [low, high] for which a predicate holds that never
+		# becomes false again for larger values, None if there is none
+		if (low > high) or (not predicate(high)):
+			return None
+		while low < high:
+			middle = (low + high) // 2
+			if predicate(middle):
+				high = middle
+			else:
+				low = middle + 1
+		return low
+
+	def _min_height(self, aspect_ratio, max_height):
+		# Lower bound of the grid height. Crossword words additionally need
+		# their arrow and end marker fields and never share the arrow. Unless
+		# words are supposed to overlap, all letters need their own cell.
+		lengths = [ len(word) + (2 if self._crossword else 0) for word in self._input_words ]
+		if len(lengths) == 0:
+			return 1
+		if self._crossword:
+			cells = len(lengths) + max(lengths) - 2
+		elif self._contiguous:
+			cells = max(lengths)
+		else:
+			cells = sum(lengths)
+		axes = [ Suchsel.axis_step(rule) for rule in (self._placement or [ "lr", "tb" ]) ]
+		def fits(height):
+			(width, height) = self._grid_size(height, aspect_ratio)
+			# The longest word needs to fit with at least one rule
+			longest_fits = any(((dx == 0) or (width >= max(lengths))) and ((dy == 0) or (height >= max(lengths))) for (dx, dy) in axes)
+			return longest_fits and (width * height >= cells)
+		return self._smallest(fits, 1, max_height)
+
+	def _place_auto_size(self, seed):
+		aspect_ratio = self._aspect_ratio if (self._aspect_ratio is not None) else (self._width / self._height)
+		too_wide = self._smallest(lambda height: self._grid_size(height, aspect_ratio)[0] > self._max_size, 1, self._max_size)
+		max_height = self._max_size if (too_wide is None) else (too_wide - 1)
+		min_height = self._min_height(aspect_ratio, max_height)
+		if min_height is None:
+			raise ValueError("With an aspect ratio of %g, the words do not fit into a grid of at most %d cells in width and height." % (aspect_ratio, self._max_size))
+
+		# Random placement is tried several times per size (the word order
+		# decides whether crossword words can intersect at all), the
+		# backtracking search is systematic already
+		probes = 1 if (self._engine == "backtrack") else self._PROBE_ATTEMPTS
+		def place_with_height(height):
+			(self._width, self._height) = self._grid_size(height, aspect_ratio)
+			for probe in range(probes):
+				placed = self._place_words(seed if (probe == 0) else "%d:%d" % (seed, probe))
+				if len(placed[2]) == 0:
+					break
+			if self._verbose >= 1:
+				print("Trying %dx%d: %d of %d words placed." % (self._width, self._height, len(self._input_words) - len(placed[2]), len(self._input_words)))
+			return placed
+
+		# Grow the grid exponentially starting at the lower bound until all
+		# words fit, then bisect between the largest size that did not and
+		# the smallest size that did fit
+		too_small = min_height - 1
+		height = min_height
+		growth = 0
+		while True:
+			placed = place_with_height(height)
+			if len(placed[2]) == 0:
+				break
+			if (height == max_height) or (growth == self._MAX_GROWTH):
+				raise PuzzleNotSolvableException("Could not place all words even in a grid of %dx%d." % (self._width, self._height))
+			too_small = height
+			height = min(height * 2, max_height)
+			growth += 1
+
+		(fitting, best) = (height, placed)
+		while fitting - too_small > 1:
+			height = (too_small + fitting) // 2
+			placed = place_with_height(height)
+			if len(placed[2]) == 0:
+				(fitting, best) = (height, placed)
+			else:
+				too_small = height
+		return best
+
+	def generate(self, seed = None):
+		if seed is None:
+			seed = random.randrange(2 ** 32)
+		if self._verbose >= 1:
+			print("Seed: %d" % (seed))
+		if self._auto_size:
+			(rng, suchsel, unplaced_words) = self._place_auto_size(seed)
+		else:
+			(rng, suchsel, unplaced_words) = self._place_words(seed)
+		if self._stats is not None:
+			self._stats.set_unplaced(unplaced_words)
+
+		solution = suchsel.rows
+		blacklisted_cells = 0
+		if (not self._crossword) and (self._fill_rule is not None):
+			with self._phase("fill"):
+				filler = Alphabet(self._fill_rule, uniform_distribution = self._uniform_distribution, rng = rng)
+				blacklist = Blacklist(self._blacklist) if (self._blacklist is not None) else None
+				blacklisted_cells = suchsel.fill(filler, blacklist = blacklist)
+		return PuzzleResult(suchsel, seed = seed, placements = suchsel.placements, unplaced = list(unplaced_words), solution = solution, blacklisted_cells = blacklisted_cells)
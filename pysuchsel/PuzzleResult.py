@@ -0,0 +1,77 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from .WordSearch import WordSearch
+
+class PuzzleResult():
+	def __init__(self, puzzle, seed, placements, unplaced, solution, blacklisted_cells = 0):
+		self._puzzle = puzzle
+		self._seed = seed
+		self._placements = placements
+		self._unplaced = unplaced
+		self._solution = solution
+		self._blacklisted_cells = blacklisted_cells
+
+	@property
+	def puzzle(self):
+		return self._puzzle
+
+	@property
+	def seed(self):
+		return self._seed
+
+	@property
+	def placements(self):
+		return self._placements
+
+	@property
+	def unplaced(self):
+		return self._unplaced
+
+	@property
+	def complete(self):
+		return len(self._unplaced) == 0
+
+	@property
+	def solution(self):
+		# Rows of the grid that only contain the placed words
+		return self._solution
+
+	@property
+	def blacklisted_cells(self):
+		# Number of filler cells in which no letter could avoid spelling a
+		# word of the blacklist
+		return self._blacklisted_cells
+
+	@property
+	def grid(self):
+		# Rows of the grid as it is printed, i.e., including filler letters
+		return self._puzzle.rows
+
+	def find_duplicates(self):
+		# Occurrences of placed words in the grid (in any direction) other
+		# than the placements themselves, which make the puzzle ambiguous
+		return WordSearch(placement.word for placement in self._placements).find_duplicates(self.grid, self._placements)
+
+	def write_svg(self, output, compact = False):
+		self._puzzle.write_svg(output, compact = compact)
+
+	def svg(self, compact = False):
+		return self._puzzle.svg(compact = compact)
@@ -24,25 +24,47 @@
 #	File UUID 7e9a90a5-a1a1-4e49-a67c-5d935126abfe
 
 import random
+import bisect
+import copy
+import itertools
 
 class RandomDist():
-	def __init__(self, distribution):
-		self._sum = 0
-		self._values = [ ]
-		for (key, value) in distribution.items():
-			if value > 0:
-				self._sum += value
-				self._values.append((key, self._sum))
+	def __init__(self, distribution, rng = None):
+		self._rng = rng if (rng is not None) else random
+		self._distribution = { key: value for (key, value) in distribution.items() if value > 0 }
+		self._keys = list(self._distribution.keys())
+		self._cumulative = list(itertools.accumulate(self._distribution.values()))
+		self._sum = self._cumulative[-1] if (len(self._cumulative) > 0) else 0
+
+	@property
+	def keys(self):
+		return list(self._keys)
+
+	def subset(self, keys):
+		keys = set(keys)
+		return RandomDist({ key: value for (key, value) in self._distribution.items() if key in keys }, rng = self._rng)
+
+	def with_rng(self, rng):
+		# Returns a copy that shares the precomputed tables
+		clone = copy.copy(self)
+		clone._rng = rng if (rng is not None) else random
+		return clone
 
 	def coinflip(self):
-		return random.randint(0, 1) == 0
+		return self._rng.randint(0, 1) == 0
 
 	def event(self):
-		randval = random.random() * self._sum
-		for (key, value) in self._values:
-			if randval < value:
-				return key
-		return None
+		if len(self._keys) == 0:
+			return None
+		randval = self._rng.random() * self._sum
+		return self._keys[bisect.bisect(self._cumulative, randval)]
+
+	def events(self, count):
+		# Equivalent to calling event() count times, i.e., consumes the same
+		# random values and yields the same results
+		if len(self._keys) == 0:
+			return [ None ] * count
+		return self._rng.choices(self._keys, cum_weights = self._cumulative, k = count)
 
 if __name__ == "__main__":
 	rdist = RandomDist({
@@ -54,8 +76,7 @@ if __name__ == "__main__":
 
 	total = 300000
 	events = { }
-	for i in range(total):
-		x = rdist.event()
+	for x in rdist.events(total):
 		events[x] = events.get(x, 0) + 1
 	for (event, cnt) in events.items():
 		print("%-8s %7.4f%%" % (event, cnt / total * 100))
@@ -0,0 +1,118 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import pysuchsel
+
+class ResultCache():
+	# Content-addressed store of created puzzles. The key is a hash over
+	# everything that determines the output, i.e., the command, the input
+	# words, the options and the seed. Every entry consists of the SVG
+	# document and the messages that were printed when it was created. When
+	# the cache exceeds its size, the least recently used entries are
+	# removed.
+	_IGNORED_ARGS = set([ "infile", "outfile", "verbose", "jobs", "grid_backend", "no_cache", "cache_dir", "cache_size", "stats" ])
+
+	def __init__(self, directory = None, max_size = 256 * 1024 * 1024):
+		if directory is None:
+			directory = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pysuchsel")
+		self._directory = directory
+		self._max_size = max_size
+
+	@classmethod
+	def for_args(cls, args):
+		# Without a seed, every run is supposed to create a different puzzle,
+		# so nothing is cached
+		if args.no_cache or (args.seed is None):
+			return None
+		return cls(directory = args.cache_dir, max_size = args.cache_size * 1024 * 1024)
+
+	@classmethod
+	def key(cls, command, input_lines, args):
+		options = { name: value for (name, value) in sorted(vars(args).items()) if name not in cls._IGNORED_ARGS }
+		normalized = json.dumps({ "version": pysuchsel.VERSION, "command": command, "input": input_lines, "options": options }, sort_keys = True)
+		return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+	def _path(self, key, extension):
+		return os.path.join(self._directory, key[:2], key + extension)
+
+	def restore(self, key, output_filename):
+		# Returns the messages of the cached entry after copying its SVG to
+		# the output file or None if there is no such entry
+		try:
+			with open(self._path(key, ".json")) as f:
+				messages = json.load(f)["messages"]
+			shutil.copyfile(self._path(key, ".svg"), output_filename)
+		except (OSError, ValueError, KeyError):
+			return None
+		# Access time is not reliable on many file systems, so the
+		# modification time marks the last use
+		os.utime(self._path(key, ".json"))
+		return messages
+
+	def _write_atomically(self, filename, data):
+		(fd, tmpname) = tempfile.mkstemp(dir = os.path.dirname(filename), prefix = ".tmp")
+		try:
+			with os.fdopen(fd, "wb") as f:
+				f.write(data)
+			os.replace(tmpname, filename)
+		except BaseException:
+			os.unlink(tmpname)
+			raise
+
+	def store(self, key, svg_filename, messages):
+		os.makedirs(os.path.dirname(self._path(key, "")), exist_ok = True)
+		with open(svg_filename, "rb") as f:
+			svg_data = f.read()
+		# The SVG is written first, an entry only becomes visible with its
+		# metadata file
+		self._write_atomically(self._path(key, ".svg"), svg_data)
+		self._write_atomically(self._path(key, ".json"), json.dumps({ "messages": messages }).encode("utf-8"))
+		self._evict()
+
+	def _evict(self):
+		entries = [ ]
+		total_size = 0
+		for subdir in os.scandir(self._directory):
+			if not subdir.is_dir():
+				continue
+			for entry in os.scandir(subdir.path):
+				if not entry.name.endswith(".json"):
+					continue
+				svg_filename = entry.path[:-len(".json")] + ".svg"
+				try:
+					size = entry.stat().st_size + os.stat(svg_filename).st_size
+				except FileNotFoundError:
+					continue
+				entries.append((entry.stat().st_mtime, size, entry.path, svg_filename))
+				total_size += size
+		entries.sort()
+		while (total_size > self._max_size) and (len(entries) > 0):
+			(_, size, json_filename, svg_filename) = entries.pop(0)
+			for filename in [ json_filename, svg_filename ]:
+				try:
+					os.unlink(filename)
+				except FileNotFoundError:
+					pass
+			total_size -= size
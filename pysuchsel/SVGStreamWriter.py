@@ -0,0 +1,206 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+
+import io
+import tempfile
+import html
+
+class SVGExtents():
+	# Has the drawing interface of SVGStreamWriter, but only determines the
+	# bounding box of everything that would be drawn.
+	def __init__(self):
+		(self.minx, self.miny, self.maxx, self.maxy) = (None, None, None, None)
+
+	def _extend(self, x, y, width, height):
+		if self.minx is None:
+			(self.minx, self.miny, self.maxx, self.maxy) = (x, y, x + width, y + height)
+		else:
+			self.minx = min(self.minx, x)
+			self.miny = min(self.miny, y)
+			self.maxx = max(self.maxx, x + width)
+			self.maxy = max(self.maxy, y + height)
+
+	@property
+	def bounding_box(self):
+		if self.minx is None:
+			return (0, 0, 0, 0)
+		return (self.minx, self.miny, self.maxx, self.maxy)
+
+	def begin_layer(self, label, hidden = False):
+		pass
+
+	def end_layer(self):
+		pass
+
+	def rect(self, x, y, width, height, fill = "none", stroke = "#000000"):
+		self._extend(x, y, width, height)
+
+	def text(self, x, y, width, height, text, bold = False, halign = "center"):
+		self._extend(x, y, width, height)
+
+class SVGStreamWriter():
+	# Writes SVG documents element by element directly to a file, producing
+	# the same markup that pysvgedit would create for layers, rectangles and
+	# (Inkscape flowed) text, but without ever building an object tree. The
+	# document extents need to be known in advance.
+	#
+	# In compact mode, every distinct rectangle is defined once as a template
+	# and referenced by <use>, and texts are plain <text> elements styled by
+	# a shared stylesheet, which makes the files several times smaller.
+	_NAMESPACES = {
+		"xmlns":			"http://www.w3.org/2000/svg",
+		"xmlns:inkscape":	"http://www.inkscape.org/namespaces/inkscape",
+		"xmlns:sodipodi":	"http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+		"xmlns:svg":		"http://www.w3.org/2000/svg",
+		"xmlns:rdf":		"http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+		"xmlns:cc":			"http://creativecommons.org/ns#",
+		"xmlns:dc":			"http://purl.org/dc/elements/1.1/",
+		"xmlns:xlink":		"http://www.w3.org/1999/xlink",
+	}
+	_RECT_STYLE = "fill:%s;stroke:%s;stroke-width:1px;stroke-linecap:butt;stroke-linejoin:miter;stroke-opacity:1"
+	_TEXT_STYLE = "font-style:normal;font-weight:%s;font-size:12px;line-height:1.25;font-family:sans-serif;white-space:pre;fill:#000000;fill-opacity:1;stroke:none;text-align:%s;shape-inside:url(#%s)"
+	_FONT_SIZE = 12
+	_COMPACT_STYLESHEET = "text{font-size:12px;font-family:sans-serif;fill:#000000}.b{font-weight:bold}.l{text-anchor:start}.c{text-anchor:middle}.r{text-anchor:end}"
+
+	def __init__(self, f, minx, miny, maxx, maxy, slack = 1, compact = False, close_file = True):
+		# (minx, miny) - (maxx, maxy) is the bounding box of all content
+		self._f = f
+		self._close_file = close_file
+		self._compact = compact
+		self._next_id = 1
+		self._in_layer = False
+		self._templates = { }
+		# Text shapes and rectangle templates are referenced from the drawn
+		# elements but are placed in a trailing <defs> section, so they're
+		# spooled until the end.
+		self._defs = tempfile.SpooledTemporaryFile(max_size = 1024 * 1024, mode = "w+", encoding = "utf-8")
+		self._translate = (slack / 2 - minx, slack / 2 - miny)
+		width = maxx - minx + slack
+		height = maxy - miny + slack
+		namespaces = " ".join("%s=%s" % (name, self._quoteattr(uri)) for (name, uri) in self._NAMESPACES.items())
+		self._f.write("<?xml version=\"1.0\" ?><svg %s width=\"%s\" height=\"%s\">" % (namespaces, float(width), float(height)))
+		if self._compact:
+			self._f.write("<defs id=\"%s\"><style type=\"text/css\">%s</style></defs>" % (self._id(), self._COMPACT_STYLESHEET))
+
+	@classmethod
+	def open(cls, filename, minx, miny, maxx, maxy, slack = 1, compact = False):
+		return cls(open(filename, "w", encoding = "utf-8"), minx, miny, maxx, maxy, slack = slack, compact = compact)
+
+	@classmethod
+	def render(cls, output, render_function, compact = False):
+		# Calls the render function twice, first to determine the document
+		# extents and then to write the document. The output is either a
+		# filename or a text stream, which is left open.
+		extents = SVGExtents()
+		render_function(extents)
+		if isinstance(output, str):
+			svg = cls.open(output, *extents.bounding_box, compact = compact)
+		else:
+			svg = cls(output, *extents.bounding_box, compact = compact, close_file = False)
+		with svg:
+			render_function(svg)
+
+	@classmethod
+	def render_bytes(cls, render_function, compact = False):
+		f = io.StringIO()
+		cls.render(f, render_function, compact = compact)
+		return f.getvalue().encode("utf-8")
+
+	@staticmethod
+	def _escape(text):
+		return html.escape(str(text), quote = False)
+
+	@staticmethod
+	def _quoteattr(text):
+		return "\"%s\"" % (html.escape(str(text)))
+
+	def _id(self):
+		object_id = "id%d" % (self._next_id)
+		self._next_id += 1
+		return object_id
+
+	def _transform_attr(self):
+		# Elements outside of a layer are translated individually
+		if self._in_layer:
+			return ""
+		return " transform=\"matrix(1 0 0 1 %s %s)\"" % self._translate
+
+	def begin_layer(self, label, hidden = False):
+		self.end_layer()
+		style = " style=\"display:none\"" if hidden else ""
+		self._f.write("<g inkscape:groupmode=\"layer\" id=\"%s\" inkscape:label=%s%s transform=\"matrix(1 0 0 1 %s %s)\">" % (self._id(), self._quoteattr(label), style, self._translate[0], self._translate[1]))
+		self._in_layer = True
+
+	def end_layer(self):
+		if self._in_layer:
+			self._f.write("</g>")
+			self._in_layer = False
+
+	def _template(self, width, height, fill, stroke):
+		key = (width, height, fill, stroke)
+		template_id = self._templates.get(key)
+		if template_id is None:
+			template_id = self._id()
+			self._templates[key] = template_id
+			self._defs.write("<rect x=\"0\" y=\"0\" width=\"%s\" height=\"%s\" style=\"%s\" id=\"%s\"/>" % (width, height, self._RECT_STYLE % (fill, stroke), template_id))
+		return template_id
+
+	def rect(self, x, y, width, height, fill = "none", stroke = "#000000"):
+		if self._compact:
+			self._f.write("<use xlink:href=\"#%s\" x=\"%s\" y=\"%s\"%s/>" % (self._template(width, height, fill, stroke), x, y, self._transform_attr()))
+		else:
+			self._f.write("<rect x=\"%s\" y=\"%s\" width=\"%s\" height=\"%s\" style=\"%s\" id=\"%s\"%s/>" % (x, y, width, height, self._RECT_STYLE % (fill, stroke), self._id(), self._transform_attr()))
+
+	def text(self, x, y, width, height, text, bold = False, halign = "center"):
+		if self._compact:
+			# Baseline placed where the first line of the flowed text would be
+			anchor_x = {
+				"left":		x,
+				"center":	x + width / 2,
+				"right":	x + width,
+			}[halign]
+			css_class = ("b " if bold else "") + halign[0]
+			self._f.write("<text x=\"%g\" y=\"%g\" class=\"%s\"%s>%s</text>" % (anchor_x, y + self._FONT_SIZE, css_class, self._transform_attr(), self._escape(text)))
+		else:
+			text_id = self._id()
+			shape_id = self._id()
+			self._defs.write("<rect x=\"%s\" y=\"%s\" width=\"%s\" height=\"%s\" id=\"%s\"/>" % (x, y, width, height, shape_id))
+			self._f.write("<text xml:space=\"preserve\" style=\"%s\" id=\"%s\"%s><tspan x=\"%s\" y=\"%s\">%s</tspan></text>" % (self._TEXT_STYLE % ("bold" if bold else "normal", halign, shape_id), text_id, self._transform_attr(), x, y, self._escape(text)))
+
+	def close(self):
+		self.end_layer()
+		self._f.write("<defs id=\"%s\">" % (self._id()))
+		self._defs.seek(0)
+		while True:
+			chunk = self._defs.read(1024 * 1024)
+			if chunk == "":
+				break
+			self._f.write(chunk)
+		self._f.write("</defs></svg>")
+		self._defs.close()
+		if self._close_file:
+			self._f.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
@@ -19,15 +19,16 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import random
-from pysvgedit import SVGDocument, SVGGroup, SVGRect, Vector2D, Convenience as svgc
 from .Exceptions import PuzzleNotSolvableException
+from .SVGStreamWriter import SVGStreamWriter
 
 class SolutionWordPuzzle():
-	def __init__(self, word_list, solution_word):
+	def __init__(self, word_list, solution_word, rng = None):
 		self._word_list = [ word.upper() for word in word_list ]
 		self._solution_word = solution_word.upper()
 		self._plausibilize()
 		self._solution = None
+		self._rng = rng if (rng is not None) else random
 
 	def _plausibilize(self):
 		available_letters = set("".join(word for word in self._word_list))
@@ -36,9 +37,13 @@ class SolutionWordPuzzle():
 		if len(unavailable_letters) > 0:
 			raise PuzzleNotSolvableException("Puzzle not solvable: letter(s) %s not contained." % (", ".join(sorted(unavailable_letters))))
 
+	@property
+	def solution(self):
+		return self._solution
+
 	def find_solution(self):
 		remaining_words = list(self._word_list)
-		random.shuffle(remaining_words)
+		self._rng.shuffle(remaining_words)
 		solution_words = [ ]
 		for letter in self._solution_word:
 			for (index, candidate) in enumerate(remaining_words):
@@ -55,40 +60,34 @@ class SolutionWordPuzzle():
 			for (index, letter) in enumerate(solution_word):
 				if letter == solution_letter:
 					occurrence_indices.add(index)
-			chosen_index = random.choice(list(occurrence_indices))
+			chosen_index = self._rng.choice(sorted(occurrence_indices))
 			solution.append((solution_word, chosen_index))
 		self._solution = solution
 		return solution
 
-	def write_svg(self, output_filename):
-		svg = SVGDocument.new()
-		grid_layer = svg.add(SVGGroup.new(is_layer = True))
-		grid_layer.label = "Grid"
-		solution_layer = svg.add(SVGGroup.new(is_layer = True))
-		solution_layer.label = "Solution"
-
+	def _render_svg(self, svg):
 		size = 20
 		yoffset = 4
+		svg.begin_layer("Grid")
 		for (y, (word, letter_index)) in enumerate(self._solution):
-
 			x_begin = -letter_index - 1
-			rect = grid_layer.add(SVGRect.new(pos = size * Vector2D(x_begin, y), extents = Vector2D(size, size)))
-			rect.style["fill"] = "#3498db"
-			svgc.text(grid_layer, pos = Vector2D(size * x_begin, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = str(y + 1), halign = "center")
+			svg.rect(size * x_begin, size * y, size, size, fill = "#3498db")
+			svg.text(size * x_begin, size * y + yoffset, size, size - yoffset, str(y + 1))
+			for x_raw in range(len(word)):
+				x = x_raw - letter_index
+				svg.rect(size * x, size * y, size, size, fill = "#f1c40f" if (x == 0) else "none")
 
+		svg.begin_layer("Solution")
+		for (y, (word, letter_index)) in enumerate(self._solution):
 			for (x_raw, letter) in enumerate(word):
 				x = x_raw - letter_index
+				svg.text(size * x, size * y + yoffset, size, size - yoffset, letter, bold = (x == 0))
 
-				if x == 0:
-					rect = grid_layer.add(SVGRect.new(pos = size * Vector2D(x, y), extents = Vector2D(size, size)))
-					rect.style["fill"] = "#f1c40f"
-				else:
-					grid_layer.add(SVGRect.new(pos = size * Vector2D(x, y), extents = Vector2D(size, size)))
-
-				svgc.text(solution_layer, pos = Vector2D(size * x, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = letter, halign = "center", attribute = "bold" if (x == 0) else "none")
+	def write_svg(self, output, compact = False):
+		SVGStreamWriter.render(output, self._render_svg, compact = compact)
 
-		svgc.autosize(svg)
-		svg.writefile(output_filename)
+	def svg(self, compact = False):
+		return SVGStreamWriter.render_bytes(self._render_svg, compact = compact)
 
 
 if __name__ == "__main__":
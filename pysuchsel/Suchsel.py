@@ -19,239 +19,543 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import random
-from pysvgedit import SVGDocument, SVGGroup, SVGRect, Vector2D, Convenience as svgc
-
-class VoidPlaceholder():
-	def __eq__(self, other):
-		return other.__class__ == self.__class__
-
-	def __neq__(self, other):
-		return not (self == other)
-
-	def __str__(self):
-		return "."
-
-class ArrowMarker():
-	def __init__(self, marking, direction):
-		self._marking = marking
-		self._direction = direction
-
-	@property
-	def marking(self):
-		return self._marking
-
-	def __str__(self):
-		return {
-			"left":		"<",
-			"right":	">",
-			"down":		"v",
-		}.get(self._direction, "?")
+import itertools
+import contextlib
+import collections
+from .SVGStreamWriter import SVGStreamWriter
+from .Grid import Grid, DictGrid, ArrayGrid, VoidPlaceholder, ArrowMarker
 
 class Suchsel():
-	def __init__(self, width, height, placement, attempts, is_crossword = False):
+	# Cells are the (x, y) coordinates of the word's letters in reading order
+	Placement = collections.namedtuple("Placement", [ "word", "rule", "x", "y", "cells", "marker" ])
+
+	_GRID_BACKENDS = {
+		"dict":		DictGrid,
+		"array":	ArrayGrid,
+	}
+
+	# Step vectors of the axes along which the grid is scanned. Every
+	# placement rule maps onto one axis; rules that run against the axis
+	# direction place the reversed word instead.
+	_AXES = {
+		"lr":	(1, 0),
+		"tb":	(0, 1),
+		"dbr":	(1, 1),
+		"dbl":	(-1, 1),
+	}
+
+	# rule: (axis, reversed, crossword arrow direction)
+	_RULES = {
+		"lr":	("lr", False, "right"),
+		"rl":	("lr", True, "left"),
+		"tb":	("tb", False, "down"),
+		"bt":	("tb", True, "up"),
+		"dbr":	("dbr", False, "down-right"),
+		"dtl":	("dbr", True, "up-left"),
+		"dbl":	("dbl", False, "down-left"),
+		"dtr":	("dbl", True, "up-right"),
+	}
+
+	# Neighbours perpendicular to the axis, which need to be empty next to
+	# empty cells in crossword mode. For every axis, a mask marks the cells
+	# that have a letter or arrow field as such a neighbour ("blocked"
+	# cells); it is updated whenever a word is placed.
+	_PERPENDICULAR = {
+		"lr":	(0, 1),
+		"tb":	(1, 0),
+	}
+
+	# Random draws for a filler cell whose letter would complete a
+	# blacklisted word before all letters are tried in turn
+	_BLACKLIST_REDRAWS = 20
+
+	def __init__(self, width, height, placement, attempts, is_crossword = False, engine = "random", backend = "array", rng = None, stats = None):
+		if engine not in [ "random", "enumerate" ]:
+			raise NotImplementedError(engine)
+		if backend not in self._GRID_BACKENDS:
+			raise NotImplementedError(backend)
 		self._width = width
 		self._height = height
 		self._placement = placement
 		self._attempts = attempts
+		self._engine = engine
+		self._rng = rng if (rng is not None) else random
 		self._is_crossword = is_crossword
-		self._grid = { }
-		self._fillers_at = set()
-
-	def _rulerange(self, origin_x, origin_y, rulename):
-		(x, y) = (origin_x, origin_y)
-		while True:
-			yield (x, y)
-			if rulename == "lr":
-				x += 1
-			elif rulename == "tb":
-				y += 1
-			elif rulename == "dbr":
-				x += 1
-				y += 1
-			elif rulename == "dbl":
-				x -= 1
-				y += 1
-			elif rulename == "dtr":
-				x += 1
-				y -= 1
-			elif rulename == "dtl":
-				x -= 1
-				y -= 1
-			else:
-				raise NotImplementedError(rulename)
-
-	def _adjacent_fields(self, x, y, rulename):
-		if rulename in [ "tb", "bt" ]:
-			yield (x - 1, y)
-			yield (x + 1, y)
-		elif rulename in [ "lr", "rl" ]:
-			yield (x, y - 1)
-			yield (x, y + 1)
-		else:
-			raise NotImplementedError(rulename)
+		self._stats = stats
+		self._grid = self._GRID_BACKENDS[backend](width, height)
+		self._fillers_at = bytearray(width * height)
+		self._letter_index = { }
+		self._placed = [ ]
+		self._lines = { }
+		self._line_of = { }
+		for (axis, (dx, dy)) in self._AXES.items():
+			(self._lines[axis], self._line_of[axis]) = self._compute_lines(dx, dy)
+		self._adjacent = { axis: self._compute_adjacent(nx, ny) for (axis, (nx, ny)) in self._PERPENDICULAR.items() }
+		self._blocked = { axis: bytearray(width * height) for axis in self._PERPENDICULAR }
+
+	@classmethod
+	def axis_step(cls, rule):
+		# Returns the step vector of the axis the rule places words along
+		return cls._AXES[cls._RULES[rule][0]]
+
+	@classmethod
+	def is_reversed(cls, rule):
+		# Rules that run against their axis read the word backwards
+		return cls._RULES[rule][1]
+
+	@classmethod
+	def max_word_length(cls, width, height, rules):
+		# Longest sequence of cells that any of the rules can cover
+		lengths = [ ]
+		for (dx, dy) in (cls.axis_step(rule) for rule in rules):
+			lengths.append(min(width if (dx != 0) else height, height if (dy != 0) else width))
+		return max(lengths)
+
+	def _in_bounds(self, x, y):
+		return (0 <= x < self._width) and (0 <= y < self._height)
+
+	def _compute_lines(self, dx, dy):
+		# Returns all lines of cell indices that run along the given direction
+		# and, for every cell index, the (line number, position) in which it
+		# is found.
+		lines = [ ]
+		line_of = [ None ] * (self._width * self._height)
+		for y in range(self._height):
+			for x in range(self._width):
+				if self._in_bounds(x - dx, y - dy):
+					# Not the start of a line
+					continue
+				line = [ ]
+				(lx, ly) = (x, y)
+				while self._in_bounds(lx, ly):
+					index = lx + (ly * self._width)
+					line_of[index] = (len(lines), len(line))
+					line.append(index)
+					lx += dx
+					ly += dy
+				lines.append(line)
+		return (lines, line_of)
+
+	def _compute_adjacent(self, nx, ny):
+		adjacent = [ ]
+		for y in range(self._height):
+			for x in range(self._width):
+				adjacent.append(tuple(ax + (ay * self._width) for (ax, ay) in ((x - nx, y - ny), (x + nx, y + ny)) if self._in_bounds(ax, ay)))
+		return adjacent
 
-	def _find_rule(self, word, crossword_marker = None):
-		rule = self._placement.event()
+	def _transform_word(self, word, rule, crossword_marker = None):
+		# Returns the sequence of cell contents, their codes and the axis
+		# along which they are placed
+		(axis, reverse, direction) = self._RULES[rule]
 		if crossword_marker is not None:
-			direction = {
-				"lr":	"right",
-				"rl":	"left",
-				"tb":	"down",
-				"bt":	"up",
-				"dbr":	"down-right",
-				"dbl":	"down-left",
-				"dtr":	"up-right",
-				"dtl":	"up-left",
-			}[rule]
 			arrow_marker = ArrowMarker(marking = crossword_marker, direction = direction)
 			word = [ arrow_marker ] + list(word) + [ VoidPlaceholder() ]
-
-		if rule in [ "lr", "rl" ]:
-			req_width = len(word)
-			req_height = 1
-		elif rule in [ "tb", "bt" ]:
-			req_width = 1
-			req_height = len(word)
-		elif rule in [ "dbr", "dtl", "dtr", "dbl" ]:
-			req_width = len(word)
-			req_height = len(word)
 		else:
-			raise NotImplementedError(rule)
+			word = list(word)
+		if reverse:
+			word.reverse()
+		return (word, [ Grid.encode(item) for item in word ], axis)
+
+	def _check_window(self, codes, window, cells, axis, crossword_marker = None):
+		# Returns the number of letters the word shares with the grid when
+		# placed at the given cells (with currently present codes 'window') or
+		# None if it cannot be placed there.
+		contiguous_letters = 0
+		if any(window):
+			for (want_code, present) in zip(codes, window):
+				if present == Grid.EMPTY:
+					continue
+				if (present != want_code) or (present == Grid.ARROW):
+					# Letter already occupied with different letter than we
+					# would like there (arrow fields can never be shared)
+					if self._stats is not None:
+						self._stats.reject("letter_conflict")
+					return None
+				if present > Grid.ARROW:
+					# We count overlapping letters, but not overlapping
+					# VoidPlacerholders
+					contiguous_letters += 1
 
-		if rule in [ "rl", "bt" ]:
-			word = list(reversed(word))
-			if rule == "rl":
-				rule = "lr"
-			elif rule == "bt":
-				rule = "tb"
-		return (word, rule, req_width, req_height)
+		if crossword_marker is not None:
+			# Empty fields need empty adjacent fields if this is a crossword
+			blocked = self._blocked.get(axis)
+			if blocked is None:
+				raise NotImplementedError(axis)
+			for (present, index) in zip(window, cells):
+				if (present == Grid.EMPTY) and blocked[index]:
+					# There's a letter or arrowfield next to it, that's
+					# forbidden
+					if self._stats is not None:
+						self._stats.reject("adjacency")
+					return None
+		return contiguous_letters
+
+	def _commit_place(self, word, cells, rule):
+		self._placed.append((word, cells, rule))
+		for (want_place, index) in zip(word, cells):
+			self._grid.set_at(index, want_place)
+			if isinstance(want_place, str):
+				self._letter_index.setdefault(want_place, set()).add(index)
+			if self._is_crossword and not isinstance(want_place, VoidPlaceholder):
+				for (axis, adjacent) in self._adjacent.items():
+					blocked = self._blocked[axis]
+					for neighbour in adjacent[index]:
+						blocked[neighbour] = 1
 
 	def _attempt_place(self, word, must_be_contiguous = False, crossword_marker = None):
-		(word, rule, req_width, req_height) = self._find_rule(word, crossword_marker = crossword_marker)
+		if self._stats is not None:
+			self._stats.attempt()
+		rule = self._placement.event()
+		(word, codes, axis) = self._transform_word(word, rule, crossword_marker = crossword_marker)
+		(dx, dy) = self._AXES[axis]
 
-		max_x = self._width - req_width
-		max_y = self._height - req_height
+		max_x = self._width - (len(word) if (dx != 0) else 1)
+		max_y = self._height - (len(word) if (dy != 0) else 1)
 		if (max_x < 0) or (max_y < 0):
 			# Word does not fit with this rule, abort.
+			if self._stats is not None:
+				self._stats.reject("out_of_bounds")
 			return False
 
-		src_x = random.randint(0, max_x)
-		src_y = random.randint(0, max_y)
-
-		if rule in [ "dtl", "dbl" ]:
+		src_x = self._rng.randint(0, max_x)
+		src_y = self._rng.randint(0, max_y)
+		if dx < 0:
 			src_x += len(word) - 1
-		if rule in [ "dtr", "dtl" ]:
-			src_y += len(word) - 1
-
-		contiguous_letters = 0
-		for (want_place, (x, y)) in zip(word, self._rulerange(src_x, src_y, rule)):
-			present = self._grid.get((x, y))
-			if (present == want_place) and isinstance(present, str):
-				# We count overlapping letters, but not overlapping
-				# VoidPlacerholders
-				contiguous_letters += 1
-			if (present is not None) and (present != want_place):
-				# Letter already occupied with different letter than we would
-				# like there
-				return False
-
-			if (present is None) and (crossword_marker is not None):
-				# Field is empty, check adjacent fields for emptyness if this
-				# is a crossword
-				for (adjx, adjy) in self._adjacent_fields(x, y, rule):
-					adjacent_content = self._grid.get((adjx, adjy))
-					if (adjacent_content is not None) and not isinstance(adjacent_content, VoidPlaceholder):
-						# There's a letter or arrowfield in there, that's
-						# forbidden
-						return False
 
+		(line_no, pos) = self._line_of[axis][src_x + (src_y * self._width)]
+		cells = self._lines[axis][line_no][pos : pos + len(word)]
+		contiguous_letters = self._check_window(codes, self._grid.codes(cells), cells, axis, crossword_marker = crossword_marker)
+		if contiguous_letters is None:
+			return False
 		if must_be_contiguous and (contiguous_letters == 0):
+			if self._stats is not None:
+				self._stats.reject("non_contiguous")
 			return False
 
 		# All letters fit!
-		for (want_place, (x, y)) in zip(word, self._rulerange(src_x, src_y, rule)):
-			self._grid[(x, y)] = want_place
+		self._commit_place(word, cells, rule)
 		return True
 
+	def _enumerate_anchored(self, word, crossword_marker = None, anchors = None):
+		# Only considers placements in which at least one letter of the word
+		# coincides with an identical letter already present in the grid by
+		# looking up the occupied cells of each letter in the index. With
+		# anchors, only these cells are considered.
+		if anchors is None:
+			letter_index = self._letter_index
+		else:
+			letter_index = { }
+			for (index, code) in zip(anchors, self._grid.codes(anchors)):
+				if Grid.is_letter(code):
+					letter_index.setdefault(chr(code), [ ]).append(index)
+		candidates = { }
+		for rule in self._placement.keys:
+			(tword, codes, axis) = self._transform_word(word, rule, crossword_marker = crossword_marker)
+			(lines, line_of) = (self._lines[axis], self._line_of[axis])
+			length = len(codes)
+			seen = set()
+			rule_candidates = [ ]
+			for (offset, letter) in enumerate(tword):
+				for index in letter_index.get(letter, ()) if isinstance(letter, str) else ():
+					(line_no, pos) = line_of[index]
+					start = pos - offset
+					if (start < 0) or ((line_no, start) in seen) or (start + length > len(lines[line_no])):
+						continue
+					seen.add((line_no, start))
+					cells = lines[line_no][start : start + length]
+					contiguous_letters = self._check_window(codes, self._grid.codes(cells), cells, axis, crossword_marker = crossword_marker)
+					if contiguous_letters is not None:
+						rule_candidates.append((tword, cells, contiguous_letters, rule))
+			if self._stats is not None:
+				self._stats.attempt(len(seen))
+			if len(rule_candidates) > 0:
+				candidates[rule] = rule_candidates
+		return candidates
+
+	def enumerate_candidates(self, word, crossword_marker = None, anchored = False, anchors = None):
+		# Scans all lines of the grid once for every placement rule and
+		# returns a dictionary that maps the rule name to a list of (word,
+		# cells, contiguous_letters, rule) tuples of all valid placements. When
+		# anchored, only placements that overlap the grid are returned (or,
+		# if anchor cells are given, that overlap one of them).
+		if anchored:
+			return self._enumerate_anchored(word, crossword_marker = crossword_marker, anchors = anchors)
+		candidates = { }
+		for rule in self._placement.keys:
+			(tword, codes, axis) = self._transform_word(word, rule, crossword_marker = crossword_marker)
+			length = len(codes)
+			rule_candidates = [ ]
+			windows = 0
+			blocked = self._blocked.get(axis) if (crossword_marker is not None) else None
+			for line in self._lines[axis]:
+				if len(line) < length:
+					continue
+				windows += len(line) - length + 1
+				line_codes = self._grid.codes(line)
+				if blocked is not None:
+					# Number of empty, blocked cells up to every position of
+					# the line; windows that contain any of them are skipped
+					# without looking at their contents
+					blocked_count = list(itertools.accumulate(((code == Grid.EMPTY) and blocked[index] for (code, index) in zip(line_codes, line)), initial = 0))
+				for pos in range(len(line) - length + 1):
+					if (blocked is not None) and (blocked_count[pos + length] != blocked_count[pos]):
+						if self._stats is not None:
+							self._stats.reject("adjacency")
+						continue
+					cells = line[pos : pos + length]
+					contiguous_letters = self._check_window(codes, line_codes[pos : pos + length], cells, axis, crossword_marker = crossword_marker)
+					if contiguous_letters is not None:
+						rule_candidates.append((tword, cells, contiguous_letters, rule))
+			if self._stats is not None:
+				self._stats.attempt(windows)
+				if windows == 0:
+					self._stats.reject("out_of_bounds")
+			if len(rule_candidates) > 0:
+				candidates[rule] = rule_candidates
+		return candidates
+
+	def place_candidate(self, candidate):
+		(word, cells, _, rule) = candidate
+		self._commit_place(word, cells, rule)
+
+	def snapshot(self):
+		return (self._grid.snapshot(), { letter: set(indices) for (letter, indices) in self._letter_index.items() }, list(self._placed), { axis: bytes(blocked) for (axis, blocked) in self._blocked.items() })
+
+	def restore(self, snapshot):
+		(grid_snapshot, letter_index, placed, blocked) = snapshot
+		self._grid.restore(grid_snapshot)
+		self._letter_index = { letter: set(indices) for (letter, indices) in letter_index.items() }
+		self._placed = list(placed)
+		self._blocked = { axis: bytearray(mask) for (axis, mask) in blocked.items() }
+
+	def _place_from(self, candidates):
+		if len(candidates) == 0:
+			return False
+
+		# Choose the rule first so that the weights of the placement rule
+		# distribution are retained among all rules that can be satisfied
+		rule = self._placement.subset(candidates.keys()).event()
+		self.place_candidate(self._rng.choice(candidates[rule]))
+		return True
+
+	def _place_anchored(self, word, crossword_marker = None):
+		return self._place_from(self._enumerate_anchored(word, crossword_marker = crossword_marker))
+
+	def _place_enumerated(self, word, contiguous = False, must_be_contiguous = False, crossword_marker = None):
+		if (contiguous or must_be_contiguous) and self._place_anchored(word, crossword_marker = crossword_marker):
+			return True
+		if must_be_contiguous:
+			# Proven to be unplaceable
+			if self._stats is not None:
+				self._stats.reject("non_contiguous")
+			return False
+		return self._place_from(self.enumerate_candidates(word, crossword_marker = crossword_marker))
+
+	@property
+	def stats(self):
+		return self._stats
+
+	def word_stats(self, word):
+		return self._stats.word(word) if (self._stats is not None) else contextlib.nullcontext()
+
+	@property
+	def occupied(self):
+		return len(self._grid)
+
+	@property
+	def letter_cells(self):
+		return sum(len(indices) for indices in self._letter_index.values())
+
+	@property
+	def width(self):
+		return self._width
+
+	@property
+	def height(self):
+		return self._height
+
+	@property
+	def placements(self):
+		placements = [ ]
+		for (word, cells, rule) in self._placed:
+			letters = [ (item, index) for (item, index) in zip(word, cells) if isinstance(item, str) ]
+			markers = [ item.marking for item in word if isinstance(item, ArrowMarker) ]
+			if self._RULES[rule][1]:
+				letters.reverse()
+			cells = [ (index % self._width, index // self._width) for (item, index) in letters ]
+			placements.append(self.Placement(word = "".join(item for (item, index) in letters), rule = rule, x = cells[0][0], y = cells[0][1], cells = cells, marker = markers[0] if (len(markers) > 0) else None))
+		return placements
+
+	@property
+	def rows(self):
+		# Text representation of the grid, one string per row
+		rows = [ ]
+		for y in range(self._height):
+			row = [ ]
+			for x in range(self._width):
+				content = self._grid.get(x, y)
+				row.append(" " if (content is None) else str(content))
+			rows.append("".join(row))
+		return rows
+
 	def place(self, word, contiguous = False):
-		# First try contiguous placement
+		with self.word_stats(word):
+			return self._place(word, contiguous = contiguous)
+
+	def _place(self, word, contiguous = False):
+		if self._engine == "enumerate":
+			return self._place_enumerated(word, contiguous = contiguous and (len(self._grid) > 0))
+
+		# First try contiguous placement, which only needs to look at cells
+		# that already contain one of the word's letters
 		if contiguous and (len(self._grid) > 0):
-			for i in range(self._attempts):
-				if self._attempt_place(word, must_be_contiguous = True):
-					return True
+			if self._place_anchored(word):
+				return True
 		for i in range(self._attempts):
 			if self._attempt_place(word):
 				return True
 		return False
 
 	def place_crossword(self, word, crossword_marker):
+		with self.word_stats(word):
+			return self._place_crossword(word, crossword_marker)
+
+	def _place_crossword(self, word, crossword_marker):
 		contiguous = (len(self._grid) > 0)
+		if self._engine == "enumerate":
+			return self._place_enumerated(word, must_be_contiguous = contiguous, crossword_marker = crossword_marker)
+
+		if contiguous:
+			if self._place_anchored(word, crossword_marker = crossword_marker):
+				return True
+			if self._stats is not None:
+				self._stats.reject("non_contiguous")
+			return False
 		for i in range(self._attempts):
-			if self._attempt_place(word, must_be_contiguous = contiguous, crossword_marker = crossword_marker):
+			if self._attempt_place(word, crossword_marker = crossword_marker):
 				return True
 		return False
 
-	def fill(self, filler):
-		for y in range(self._height):
-			for x in range(self._width):
-				pos = (x, y)
-				if pos not in self._grid:
-					self._grid[pos] = filler.get()
-					self._fillers_at.add(pos)
-
-	def dump(self):
+	def _previous_state(self, states, axis, index):
+		(line_no, position) = self._line_of[axis][index]
+		return states[axis][self._lines[axis][line_no][position - 1]] if (position > 0) else 0
+
+	def _blacklist_state(self, automaton, chars, states, axis, index, char):
+		# Returns the automaton state after the letter along the axis or None
+		# if a blacklisted word (read in either direction) ends in it or in
+		# the fixed letters following it.
+		state = automaton.step(self._previous_state(states, axis, index), char)
+		if automaton.match_length(state) > 0:
+			return None
+		(line_no, position) = self._line_of[axis][index]
+		lookahead = state
+		for (steps, next_index) in enumerate(self._lines[axis][line_no][position + 1 : ], 1):
+			if (chars[next_index] is None) or (automaton.depth(lookahead) < steps):
+				# Cells that are still empty are checked when they are filled;
+				# once the letter has left the matched text, it cannot be part
+				# of any further match
+				break
+			lookahead = automaton.step(lookahead, chars[next_index])
+			if automaton.match_length(lookahead) > steps:
+				return None
+		return state
+
+	def _avoid_blacklisted(self, empty, letters, filler, automaton):
+		# Cells are visited in reading order, so for every axis the cell
+		# before the current one has its final letter and its automaton state
+		# (i.e., all partial matches that run through it) is known. Fixed
+		# letters only advance the states, filler letters that complete a
+		# blacklisted word are redrawn.
+		size = self._width * self._height
+		chars = [ chr(code) if Grid.is_letter(code) else None for code in self._grid.codes(range(size)) ]
+		drawn = dict(zip(empty, letters))
+		states = { axis: [ 0 ] * size for axis in self._AXES }
+		unavoidable = 0
+		for index in range(size):
+			if index in drawn:
+				candidates = itertools.chain([ drawn[index] ], (filler.get() for i in range(self._BLACKLIST_REDRAWS)), filler.letters)
+				for char in candidates:
+					if all(self._blacklist_state(automaton, chars, states, axis, index, char) is not None for axis in self._AXES):
+						break
+				else:
+					unavoidable += 1
+					char = drawn[index]
+				(chars[index], drawn[index]) = (char, char)
+			elif chars[index] is None:
+				continue
+			for axis in self._AXES:
+				states[axis][index] = automaton.step(self._previous_state(states, axis, index), chars[index])
+		return ([ drawn[index] for index in empty ], unavoidable)
+
+	def fill(self, filler, blacklist = None):
+		# Letters for all empty cells are drawn in one call; cells are visited
+		# in the same order as single draws would be. With a blacklist, letters
+		# that would complete a blacklisted word are redrawn afterwards.
+		# Returns the number of cells in which that could not be avoided.
+		empty = self._grid.empty_indices()
+		letters = filler.get_many(len(empty))
+		unavoidable = 0
+		if blacklist is not None:
+			(letters, unavoidable) = self._avoid_blacklisted(empty, letters, filler, blacklist.automaton)
+		self._grid.set_letters(empty, letters)
+		for index in empty:
+			self._fillers_at[index] = 1
+		return unavoidable
+
+	def dump(self, rows = None):
+		# Prints the given rows (e.g., an earlier state of the grid) or the
+		# current grid
 		print("+-" + "-" * (2 * self._width) + "-+")
+		for row in (rows if (rows is not None) else self.rows):
+			print("| " + (" ".join(row)) + "  |")
+		print("+-" + ("-" * (2 * self._width)) + "-+")
+
+	def _svg_cells(self):
+		# Yields (x, y, content, is_filler) for all cells that are drawn
 		for y in range(self._height):
-			line = [ ]
 			for x in range(self._width):
-				letter = self._grid.get((x, y), " ")
-				line.append(str(letter))
-			print("| " + (" ".join(line)) + "  |")
-		print("+-" + ("-" * (2 * self._width)) + "-+")
+				content = self._grid.get(x, y)
+				if isinstance(content, (str, ArrowMarker)):
+					yield (x, y, content, self._fillers_at[x + (y * self._width)] == 1)
 
-	def write_svg(self, output_filename):
-		svg = SVGDocument.new()
+	def _render_svg(self, svg):
+		# Every layer is one pass over the grid
+		size = 20
+		yoffset = 4
+		svg.begin_layer("Grid")
+		for (x, y, content, is_filler) in self._svg_cells():
+			if isinstance(content, str):
+				svg.rect(size * x, size * y, size, size)
+			else:
+				svg.rect(size * x, size * y, size, size, stroke = "#3498db")
+				svg.text(size * x, size * y + yoffset, size, size - yoffset, str(content.marking))
 
-		grid_layer = svg.add(SVGGroup.new(is_layer = True))
-		grid_layer.label = "Grid"
 		if self._is_crossword:
-			solution_layer = svg.add(SVGGroup.new(is_layer = True))
-			solution_layer.label = "Solution"
+			svg.begin_layer("Solution")
+			for (x, y, content, is_filler) in self._svg_cells():
+				if isinstance(content, str) and (not is_filler):
+					svg.text(size * x, size * y + yoffset, size, size - yoffset, content)
 		else:
-			filler_layer = svg.add(SVGGroup.new(is_layer = True))
-			filler_layer.label = "Filler letters"
-			solution_layer = svg.add(SVGGroup.new(is_layer = True))
-			solution_layer.label = "Solution normal"
-			solution_highlight_layer = svg.add(SVGGroup.new(is_layer = True))
-			solution_highlight_layer.label = "Solution highlighted"
-
-		size = 20
-		yoffset = 4
-		for y in range(self._height):
-			for x in range(self._width):
-				pos = (x, y)
-				letter = self._grid.get(pos)
-				is_filler = pos in self._fillers_at
-				if isinstance(letter, str):
-					grid_layer.add(SVGRect.new(pos = size * Vector2D(x, y), extents = Vector2D(size, size)))
-
-					if is_filler:
-						# Random filler letter
-						svgc.text(filler_layer, pos = Vector2D(size * x, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = letter, halign = "center")
-
-					if not is_filler:
-						# Solution letter
-						svgc.text(solution_layer, pos = Vector2D(size * x, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = letter, halign = "center")
-
-						if not self._is_crossword:
-							# Additionally, put in bold and highlight in the solution highlight layer
-							rect = solution_highlight_layer.add(SVGRect.new(pos = size * Vector2D(x, y), extents = Vector2D(size, size)))
-							rect.style["fill"] = "#f1c40f"
-							svgc.text(solution_highlight_layer, pos = Vector2D(size * x, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = letter, halign = "center", attribute = "bold")
-				elif isinstance(letter, ArrowMarker):
-					rect = grid_layer.add(SVGRect.new(pos = size * Vector2D(x, y), extents = Vector2D(size, size)))
-					rect.style["stroke"] = "#3498db"
-					svgc.text(grid_layer, pos = Vector2D(size * x, size * y + yoffset), extents = Vector2D(size, size - yoffset), text = str(letter.marking), halign = "center")
-
-		svgc.autosize(svg)
-		svg.writefile(output_filename)
+			svg.begin_layer("Filler letters")
+			for (x, y, content, is_filler) in self._svg_cells():
+				if isinstance(content, str) and is_filler:
+					# Random filler letter
+					svg.text(size * x, size * y + yoffset, size, size - yoffset, content)
+
+			svg.begin_layer("Solution normal")
+			for (x, y, content, is_filler) in self._svg_cells():
+				if isinstance(content, str) and (not is_filler):
+					svg.text(size * x, size * y + yoffset, size, size - yoffset, content)
+
+			# Additionally, put in bold and highlight in the solution highlight layer
+			svg.begin_layer("Solution highlighted")
+			for (x, y, content, is_filler) in self._svg_cells():
+				if isinstance(content, str) and (not is_filler):
+					svg.rect(size * x, size * y, size, size, fill = "#f1c40f")
+					svg.text(size * x, size * y + yoffset, size, size - yoffset, content, bold = True)
+
+	def write_svg(self, output, compact = False):
+		SVGStreamWriter.render(output, self._render_svg, compact = compact)
+
+	def svg(self, compact = False):
+		return SVGStreamWriter.render_bytes(self._render_svg, compact = compact)
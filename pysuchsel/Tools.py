@@ -18,18 +18,87 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
+import sys
+import mmap
 import random
 
 class Tools():
 	@classmethod
-	def read_file(cls, filename, shuffle = False):
-		words = [ ]
-		with open(filename) as f:
-			for line in f:
-				line = line.strip(" \t\r\n")
-				if line.startswith("#") or line == "":
-					continue
-				words.append(line.upper())
+	def _iter_lines(cls, filename):
+		# Lines are read one by one, so even very large dictionaries never
+		# need to be held in memory as a whole. "-" reads from stdin.
+		if filename == "-":
+			yield from sys.stdin
+			return
+		extension = os.path.splitext(filename)[1].lower()
+		if extension in [ ".gz", ".xz" ]:
+			if extension == ".gz":
+				import gzip
+				f = gzip.open(filename, "rt", encoding = "utf-8")
+			else:
+				import lzma
+				f = lzma.open(filename, "rt", encoding = "utf-8")
+			with f:
+				yield from f
+			return
+		with open(filename, "rb") as f:
+			try:
+				mapped = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+			except (ValueError, OSError):
+				# Empty files and devices cannot be mapped
+				yield from (line.decode("utf-8") for line in f)
+				return
+			with mapped:
+				for line in iter(mapped.readline, b""):
+					yield line.decode("utf-8")
+
+	@classmethod
+	def iter_words(cls, filename):
+		for line in cls._iter_lines(filename):
+			line = line.strip(" \t\r\n")
+			if line.startswith("#") or line == "":
+				continue
+			yield line.upper()
+
+	@classmethod
+	def word_filter(cls, min_length = None, max_length = None, letters = None):
+		# Returns a predicate for words or None if all words are accepted
+		if (min_length is None) and (max_length is None) and (letters is None):
+			return None
+		min_length = min_length or 0
+		max_length = max_length if (max_length is not None) else float("inf")
+		letters = set(letters.upper()) if (letters is not None) else None
+		def accept(word):
+			if not (min_length <= len(word) <= max_length):
+				return False
+			return (letters is None) or letters.issuperset(word)
+		return accept
+
+	@classmethod
+	def reservoir_sample(cls, items, count, rng = None):
+		# Uniformly chooses count items from an iterable of unknown length in
+		# a single pass, only ever holding count items.
+		rng = rng if (rng is not None) else random
+		sample = [ ]
+		for (index, item) in enumerate(items):
+			if index < count:
+				sample.append(item)
+			else:
+				replace = rng.randrange(index + 1)
+				if replace < count:
+					sample[replace] = item
+		return sample
+
+	@classmethod
+	def read_file(cls, filename, shuffle = False, rng = None, accept = None, sample = None):
+		words = cls.iter_words(filename)
+		if accept is not None:
+			words = filter(accept, words)
+		if sample is not None:
+			words = cls.reservoir_sample(words, sample, rng = rng)
+		else:
+			words = list(words)
 		if shuffle:
-			random.shuffle(words)
+			(rng if (rng is not None) else random).shuffle(words)
 		return words
@@ -0,0 +1,143 @@
+#	pysuchsel - Create Suchsel word puzzles from Python
+#	Copyright (C) 2019-2023 Johannes Bauer
+#
+#	This file is part of pysuchsel.
+#
+#	pysuchsel is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	pysuchsel is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import collections
+from .AhoCorasick import AhoCorasick
+from .Suchsel import Suchsel
+
+class WordSearch():
+	# Finds all occurrences of a list of words in a grid of letters, in any of
+	# the given placement directions. Every row, column and diagonal is read
+	# once in axis direction; words in reverse direction are found as their
+	# reversed spelling, so each line is scanned a single time for all words
+	# and directions.
+	Occurrence = collections.namedtuple("Occurrence", [ "word", "rule", "x", "y", "cells" ])
+	ALL_RULES = [ "lr", "rl", "tb", "bt", "dbr", "dtl", "dbl", "dtr" ]
+
+	def __init__(self, words, rules = None):
+		self._words = sorted(set(word.upper() for word in words))
+		self._rules = list(rules) if (rules is not None) else self.ALL_RULES
+		self._axes = { }
+		for rule in self._rules:
+			self._axes.setdefault(Suchsel.axis_step(rule), { })[Suchsel.is_reversed(rule)] = rule
+		patterns = [ ]
+		self._pattern_info = [ ]
+		for word in self._words:
+			for reverse in [ False, True ]:
+				if any(reverse in rules for rules in self._axes.values()):
+					patterns.append(word[::-1] if reverse else word)
+					self._pattern_info.append((word, reverse))
+		self._automaton = AhoCorasick(patterns)
+
+	@property
+	def words(self):
+		return self._words
+
+	@staticmethod
+	def _lines(width, height, dx, dy):
+		# Yields the (x, y) coordinates of all lines that run along the axis
+		for y in range(height):
+			for x in range(width):
+				if (0 <= x - dx < width) and (0 <= y - dy < height):
+					# Not the start of a line
+					continue
+				line = [ ]
+				(lx, ly) = (x, y)
+				while (0 <= lx < width) and (0 <= ly < height):
+					line.append((lx, ly))
+					lx += dx
+					ly += dy
+				yield line
+
+	def find(self, rows):
+		# Returns all occurrences in the grid given as one string per row.
+		# Rows may have different lengths. A palindrome (or a word of a
+		# single letter) that can be read in both directions of an axis is
+		# reported once.
+		width = max((len(row) for row in rows), default = 0)
+		rows = [ row.ljust(width) for row in rows ]
+		occurrences = [ ]
+		seen = set()
+		for ((dx, dy), rules) in self._axes.items():
+			for line in self._lines(width, len(rows), dx, dy):
+				text = "".join(rows[y][x] for (x, y) in line)
+				for (end, pattern_id) in self._automaton.search(text):
+					(word, reverse) = self._pattern_info[pattern_id]
+					if reverse not in rules:
+						continue
+					cells = line[end - len(word) + 1 : end + 1]
+					if reverse:
+						cells = cells[::-1]
+					key = (word, frozenset(cells))
+					if key in seen:
+						continue
+					seen.add(key)
+					occurrences.append(self.Occurrence(word = word, rule = rules[reverse], x = cells[0][0], y = cells[0][1], cells = cells))
+		occurrences.sort(key = lambda occurrence: (occurrence.word, occurrence.y, occurrence.x, self._rules.index(occurrence.rule)))
+		return occurrences
+
+	def find_duplicates(self, rows, placements):
+		# Returns all occurrences of placed words that are not one of the
+		# placements themselves, e.g., created by filler letters
+		placed = set((placement.word, frozenset(placement.cells)) for placement in placements)
+		return [ occurrence for occurrence in self.find(rows) if (occurrence.word, frozenset(occurrence.cells)) not in placed ]
+
+if __name__ == "__main__":
+	# Compares the search against a brute-force scan of every cell and
+	# direction on random grids
+	import random
+	steps = { rule: Suchsel.axis_step(rule) for rule in WordSearch.ALL_RULES }
+	steps = { rule: ((-dx, -dy) if Suchsel.is_reversed(rule) else (dx, dy)) for (rule, (dx, dy)) in steps.items() }
+
+	def brute_force(rows, words, rules):
+		(width, height) = (max(len(row) for row in rows), len(rows))
+		rows = [ row.ljust(width) for row in rows ]
+		found = set()
+		for word in words:
+			for rule in rules:
+				(dx, dy) = steps[rule]
+				for y in range(height):
+					for x in range(width):
+						cells = [ (x + (i * dx), y + (i * dy)) for i in range(len(word)) ]
+						if all((0 <= cx < width) and (0 <= cy < height) and (rows[cy][cx] == letter) for ((cx, cy), letter) in zip(cells, word)):
+							found.add((word, frozenset(cells)))
+		return found
+
+	rng = random.Random(1)
+	for trial in range(500):
+		rows = [ "".join(rng.choice("ABC") for x in range(rng.randint(1, 7))) for y in range(rng.randint(1, 7)) ]
+		words = set("".join(rng.choice("AB") for i in range(rng.randint(1, 3))) for word_no in range(4))
+		rules = rng.sample(WordSearch.ALL_RULES, rng.randint(1, len(WordSearch.ALL_RULES)))
+		search = WordSearch(words, rules = rules)
+		occurrences = search.find(rows)
+		for occurrence in occurrences:
+			(dx, dy) = steps[occurrence.rule]
+			assert occurrence.cells == [ (occurrence.x + (i * dx), occurrence.y + (i * dy)) for i in range(len(occurrence.word)) ], occurrence
+		expected = brute_force(rows, words, rules)
+		assert set((occurrence.word, frozenset(occurrence.cells)) for occurrence in occurrences) == expected, (rows, words, rules)
+		assert len(occurrences) == len(expected)
+
+		# Some of the occurrences are considered to be placements, all others
+		# are duplicates
+		placements = rng.sample(occurrences, rng.randint(0, len(occurrences)))
+		placed = set((placement.word, frozenset(placement.cells)) for placement in placements)
+		duplicates = search.find_duplicates(rows, placements)
+		assert set((duplicate.word, frozenset(duplicate.cells)) for duplicate in duplicates) == (expected - placed), (rows, words, rules)
+	print("%d random grids OK" % (trial + 1))
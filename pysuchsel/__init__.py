@@ -19,3 +19,34 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 VERSION = "0.0.2rc0"
+
+# Library interface. Modules are imported on first use so that importing the
+# package (e.g., for the command line interface) stays cheap.
+def generate_suchsel(words, width = 15, height = 20, seed = None, **kwargs):
+	# Keyword arguments are passed to PuzzleGenerator
+	from .PuzzleGenerator import PuzzleGenerator
+	return PuzzleGenerator(words, width = width, height = height, crossword = False, **kwargs).generate(seed = seed)
+
+def generate_crossword(words, width = 15, height = 20, seed = None, **kwargs):
+	# Keyword arguments are passed to PuzzleGenerator
+	from .PuzzleGenerator import PuzzleGenerator
+	return PuzzleGenerator(words, width = width, height = height, crossword = True, **kwargs).generate(seed = seed)
+
+def generate_crypto(lines, alphabets, reveal = "", solution_word = None, seed = None):
+	import random
+	from .CryptoPuzzle import CryptoPuzzle
+	return CryptoPuzzle(plain_lines = [ line.upper() for line in lines ], alphabet_names = alphabets, reveal_letters = reveal.upper(), crypto_solution = solution_word, rng = random.Random(seed))
+
+def generate_solution_word(words, solution_word, attempts = 500, seed = None):
+	# Raises PuzzleNotSolvableException if no solution is found
+	import random
+	from .SolutionWordPuzzle import SolutionWordPuzzle
+	from .Exceptions import PuzzleNotSolvableException
+	swp = SolutionWordPuzzle(word_list = words, solution_word = solution_word, rng = random.Random(seed))
+	for i in range(attempts):
+		try:
+			swp.find_solution()
+			return swp
+		except PuzzleNotSolvableException:
+			continue
+	raise PuzzleNotSolvableException("Could not find a solution for this word puzzle.")
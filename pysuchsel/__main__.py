@@ -20,54 +20,140 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
 import sys
+import argparse
 import pysuchsel
 from .MultiCommand import MultiCommand
-from .ActionSuchselCrossword import ActionSuchselCrossword
-from .ActionSolutionWord import ActionSolutionWord
-from .ActionCrypto import ActionCrypto
-from .ActionFontTest import ActionFontTest
 
-def main():
+def positive_int(value):
+	result = int(value)
+	if result <= 0:
+		raise argparse.ArgumentTypeError("must be larger than zero: %s" % (value))
+	return result
+
+def positive_float(value):
+	result = float(value)
+	if not (result > 0):
+		raise argparse.ArgumentTypeError("must be larger than zero: %s" % (value))
+	return result
+
+def create_multicommand():
 	mc = MultiCommand(trailing_text = "version: pysuchsel v%s" % (pysuchsel.VERSION))
 
 	def genparser(parser):
 		parser.add_argument("-f", "--fill-rule", choices = [ "en", "de" ], default = "en", help = "Distribute empty spaces with this alphabet and natural language frequency distribution. I.e., every letter occurs with the same probability or is the frequency that is also commonly found in the natural language used. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("--blacklist", metavar = "filename", help = "File with words (one per line) that filler letters must never spell in any direction, e.g., offensive words. Filler letters that would complete one of them are drawn again.")
 		parser.add_argument("--uniform-distribution", action = "store_true", help = "Instead of choosing natural language distribution, distribute space letters uniformly. Each letter will appear with the same probability.")
-		parser.add_argument("-x", "--width", metavar = "width", type = int, default = 15, help = "Choose this width for the suchsel. Defaults to %(default)d spaces.")
-		parser.add_argument("-y", "--height", metavar = "height", type = int, default = 20, help = "Choose this height for the suchsel. Defaults to %(default)d spaces.")
+		parser.add_argument("-x", "--width", metavar = "width", type = positive_int, default = 15, help = "Choose this width for the suchsel. Defaults to %(default)d spaces.")
+		parser.add_argument("-y", "--height", metavar = "height", type = positive_int, default = 20, help = "Choose this height for the suchsel. Defaults to %(default)d spaces.")
+		parser.add_argument("--sample", metavar = "cnt", type = int, help = "Randomly choose this many words from the input file, which may be a very large dictionary. Only words that can be placed in the grid and match the --min-length, --max-length and --allowed-letters filters are chosen.")
+		parser.add_argument("--min-length", metavar = "len", type = int, help = "Only use words with at least this many letters.")
+		parser.add_argument("--max-length", metavar = "len", type = int, help = "Only use words with at most this many letters.")
+		parser.add_argument("--allowed-letters", metavar = "letters", help = "Only use words that consist of these letters, e.g., to exclude words with umlauts.")
+		parser.add_argument("--auto-size", action = "store_true", help = "Search for the smallest grid into which all words fit. The grid has the aspect ratio given by --aspect-ratio or, by default, that of --width and --height.")
+		parser.add_argument("--aspect-ratio", metavar = "ratio", type = positive_float, help = "Ratio of width to height of the grid when using --auto-size, e.g., 1 for a square grid.")
+		parser.add_argument("--pack", action = "store_true", help = "Treat the input words as a pool and fill the grid as densely as possible with words chosen from it instead of placing all of them. Placements are chosen by overlapping letters, word length, how well they fill gaps and how balanced the placement directions are. Only available for Suchsel puzzles.")
+		parser.add_argument("--target-fill", metavar = "ratio", type = float, help = "When packing, stop as soon as this fraction of the grid (e.g., 0.8) is covered by words. By default, words are packed until no further word fits.")
+		parser.add_argument("--max-words", metavar = "cnt", type = int, help = "When packing, stop after this many words have been placed.")
 		parser.add_argument("-p", "--placement", choices = [ "lr", "tb", "rl", "bt", "dbr", "dtr", "dbl", "dtl" ], action = "append", default = [ ], help = "Defines the placement rule of words within the suchsel. Can be specified multiple times and accepts %(choices)s as option. By default tb and lr is used (top -> bottom and left -> right). Choices beginning with 'd' mean diagonal (diagonal to bottom right/bottom left/top right/top left).")
 		parser.add_argument("-c", "--contiguous", action = "store_true", help = "Try to create a contiguous Suchsel, i.e., where some letters overlap.")
 		parser.add_argument("--place-attempts", metavar = "cnt", type = int, default = 500, help = "Placing words is non-deterministic. This increases the amounts of attempts for placing a word before giving up. Longer might yield better results, but also takes longer.")
+		parser.add_argument("-e", "--engine", choices = [ "random", "enumerate", "backtrack" ], default = "random", help = "Placement engine to use. 'random' tries random origins up to --place-attempts times, 'enumerate' determines all valid placements of a word in one pass and chooses one of them randomly, i.e., a word that cannot be placed that way can never be placed. 'backtrack' orders the words by constraint (longest first) and searches for a placement of all words, undoing previous placements when it runs into a dead end. Can be one of %(choices)s, defaults to %(default)s.")
+		parser.add_argument("--search-nodes", metavar = "cnt", type = int, default = 10000, help = "When using the backtracking engine, give up after this many placements have been tried and keep the best result. Defaults to %(default)d.")
+		parser.add_argument("--search-timeout", metavar = "secs", type = float, help = "When using the backtracking engine, give up after this many seconds and keep the best result. Unlimited by default.")
+		parser.add_argument("--grid-backend", choices = [ "array", "dict" ], default = "array", help = "Internal representation of the grid. 'array' is a compact array of cell codes, 'dict' is the legacy dictionary representation. Both produce the same results; this is mainly useful for comparing performance. Can be one of %(choices)s, defaults to %(default)s.")
 		parser.add_argument("-a", "--creation-attempts", metavar = "cnt", type = int, default = 1, help = "Sometimes, not all words can be placed. This gives the number of attempts that creation of the Suchsel/cross word puzzle is re-attempted before giving up.")
+		parser.add_argument("-j", "--jobs", metavar = "cnt", type = int, default = 1, help = "Run this many creation attempts concurrently in separate processes. As soon as one attempt places all words, all others are cancelled. Defaults to %(default)d.")
+		parser.add_argument("--verify", action = "store_true", help = "After the puzzle has been created, search the grid for further occurrences of the placed words in any direction (e.g., formed by filler letters), which make the puzzle ambiguous, and warn about them.")
+		parser.add_argument("--stats", action = "store_true", help = "Collect statistics about the creation of the puzzle (placement attempts and rejection reasons for every word, time per word and per phase) and print them as JSON.")
+		parser.add_argument("--keep-best", action = "store_true", help = "When no creation attempt places all words, use the attempt that placed the most words (and, among those, has the most overlapping letters) instead of the last one. When packing, the attempt that fills the most cells is always used.")
+		parser.add_argument("--seed", metavar = "value", type = int, help = "Seed for the random number generator. Using the same seed and parameters again creates the identical puzzle. By default, a random seed is chosen.")
+		parser.add_argument("--compact-svg", action = "store_true", help = "Write compact SVG output in which identical cell boxes are defined once and referenced and text is styled by a shared stylesheet. Files are much smaller and faster to process, but text is not created as Inkscape flowed text.")
+		parser.add_argument("--no-cache", action = "store_true", help = "Do not look up or store the created puzzle in the result cache. Puzzles are only cached when a seed is given.")
+		parser.add_argument("--cache-dir", metavar = "path", help = "Directory of the result cache. Defaults to $XDG_CACHE_HOME/pysuchsel or ~/.cache/pysuchsel.")
+		parser.add_argument("--cache-size", metavar = "MiB", type = int, default = 256, help = "Maximum size of the result cache; least recently used puzzles are removed when it grows larger. Defaults to %(default)d MiB.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
-		parser.add_argument("infile", metavar = "infile", help = "Input filename that contains all words separated by newlines.")
+		parser.add_argument("infile", metavar = "infile", help = "Input filename that contains all words separated by newlines. Files ending in .gz or .xz are decompressed, '-' reads from stdin.")
 		parser.add_argument("outfile", metavar = "outfile", help = "Output SVG file to create.")
-	mc.register("suchsel", "Create a Suchsel word puzzle", genparser, action = ActionSuchselCrossword)
-	mc.register("crossword", "Create a crossword puzzle", genparser, action = ActionSuchselCrossword)
+	mc.register("suchsel", "Create a Suchsel word puzzle", genparser, action = "pysuchsel.ActionSuchselCrossword:ActionSuchselCrossword")
+	mc.register("crossword", "Create a crossword puzzle", genparser, action = "pysuchsel.ActionSuchselCrossword:ActionSuchselCrossword")
+
+	def genparser(parser):
+		parser.add_argument("-p", "--placement", choices = [ "lr", "tb", "rl", "bt", "dbr", "dtr", "dbl", "dtl" ], action = "append", default = [ ], help = "Only search words in this direction. Can be specified multiple times and accepts %(choices)s as option. By default, all directions are searched.")
+		parser.add_argument("-d", "--duplicates", action = "store_true", help = "Only report words that occur more than once.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
+		parser.add_argument("gridfile", metavar = "gridfile", help = "Text file that contains the letter grid, one row per line. Whitespace between letters is ignored.")
+		parser.add_argument("infile", metavar = "infile", help = "Input filename that contains all words to search, separated by newlines.")
+	mc.register("find", "Find all occurrences of words in a text grid", genparser, action = "pysuchsel.ActionFind:ActionFind")
 
 	def genparser(parser):
 		parser.add_argument("--place-attempts", metavar = "cnt", type = int, default = 500, help = "Placing words is non-deterministic. This increases the amounts of attempts for placing a word before giving up. Longer might yield better results, but also takes longer.")
+		parser.add_argument("--seed", metavar = "value", type = int, help = "Seed for the random number generator. Using the same seed and parameters again creates the identical puzzle. By default, a random seed is chosen.")
+		parser.add_argument("--compact-svg", action = "store_true", help = "Write compact SVG output in which identical cell boxes are defined once and referenced and text is styled by a shared stylesheet. Files are much smaller and faster to process, but text is not created as Inkscape flowed text.")
+		parser.add_argument("--no-cache", action = "store_true", help = "Do not look up or store the created puzzle in the result cache. Puzzles are only cached when a seed is given.")
+		parser.add_argument("--cache-dir", metavar = "path", help = "Directory of the result cache. Defaults to $XDG_CACHE_HOME/pysuchsel or ~/.cache/pysuchsel.")
+		parser.add_argument("--cache-size", metavar = "MiB", type = int, default = 256, help = "Maximum size of the result cache; least recently used puzzles are removed when it grows larger. Defaults to %(default)d MiB.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
 		parser.add_argument("infile", metavar = "infile", help = "Input filename that contains all words separated by newlines.")
 		parser.add_argument("outfile", metavar = "outfile", help = "Output SVG file to create.")
 		parser.add_argument("solword", metavar = "word", help = "Solution word to search.")
-	mc.register("solword", "Create a solution word puzzle", genparser, action = ActionSolutionWord)
+	mc.register("solword", "Create a solution word puzzle", genparser, action = "pysuchsel.ActionSolutionWord:ActionSolutionWord")
 
 	def genparser(parser):
 		parser.add_argument("-a", "--alphabet", choices = [ "alpha", "math", "graph", "zodiac", "chess", "runes" ], action = "append", default = [ ], required = True, help = "Name of the ciphertext alphabet(s) to use. Can be specified multiple times, can be any of %(choices)s. Must be given at least once.")
 		parser.add_argument("-r", "--reveal", metavar = "letters", default = "ERNSTL", help = "Letters to initially reveal. Defaults to %(default)s.")
 		parser.add_argument("-w", "--solution-word", metavar = "word", help = "When puzzle should contain a final solution word, this parameter sets it.")
+		parser.add_argument("--seed", metavar = "value", type = int, help = "Seed for the random number generator. Using the same seed and parameters again creates the identical puzzle. By default, a random seed is chosen.")
+		parser.add_argument("--compact-svg", action = "store_true", help = "Write compact SVG output in which identical cell boxes are defined once and referenced and text is styled by a shared stylesheet. Files are much smaller and faster to process, but text is not created as Inkscape flowed text.")
+		parser.add_argument("--no-cache", action = "store_true", help = "Do not look up or store the created puzzle in the result cache. Puzzles are only cached when a seed is given.")
+		parser.add_argument("--cache-dir", metavar = "path", help = "Directory of the result cache. Defaults to $XDG_CACHE_HOME/pysuchsel or ~/.cache/pysuchsel.")
+		parser.add_argument("--cache-size", metavar = "MiB", type = int, default = 256, help = "Maximum size of the result cache; least recently used puzzles are removed when it grows larger. Defaults to %(default)d MiB.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
 		parser.add_argument("infile", metavar = "infile", help = "Input filename that contains all lines separated by newlines.")
 		parser.add_argument("outfile", metavar = "outfile", help = "Output SVG file to create.")
-	mc.register("crypto", "Create crypto word puzzle", genparser, action = ActionCrypto)
+	mc.register("crypto", "Create crypto word puzzle", genparser, action = "pysuchsel.ActionCrypto:ActionCrypto")
 
 	def genparser(parser):
 		parser.add_argument("-s", "--sort", action = "store_true", help = "Sort the alphabets before printing")
+		parser.add_argument("--compact-svg", action = "store_true", help = "Write compact SVG output in which identical cell boxes are defined once and referenced and text is styled by a shared stylesheet. Files are much smaller and faster to process, but text is not created as Inkscape flowed text.")
 		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
 		parser.add_argument("outfile", metavar = "outfile", help = "Output SVG file to create.")
-	mc.register("fonttest", "Test the fonts for crypto word puzzles", genparser, action = ActionFontTest)
+	mc.register("fonttest", "Test the fonts for crypto word puzzles", genparser, action = "pysuchsel.ActionFontTest:ActionFontTest")
 
+	def genparser(parser):
+		parser.add_argument("-j", "--jobs", metavar = "cnt", type = int, default = 1, help = "Number of worker processes that generate puzzles concurrently. Defaults to %(default)d.")
+		parser.add_argument("-r", "--report", metavar = "filename", help = "Write a JSON report with result and timing of every job to this file.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
+		parser.add_argument("manifest", metavar = "manifest", help = "JSON or CSV file that describes the puzzles to create. Every job names the command to run and its options by their long option name, e.g., {\"command\": \"suchsel\", \"width\": 20, \"placement\": [ \"lr\", \"tb\" ], \"infile\": \"words.txt\", \"outfile\": \"out.svg\"}. In CSV files, every column is an option and multiple values are separated by whitespace.")
+	mc.register("batch", "Create many puzzles described by a manifest file in one process", genparser, action = "pysuchsel.ActionBatch:ActionBatch")
+
+	def genparser(parser):
+		parser.add_argument("-b", "--bind", metavar = "addr", default = "127.0.0.1", help = "Address to listen on. Defaults to %(default)s.")
+		parser.add_argument("-p", "--port", metavar = "port", type = int, default = 8080, help = "TCP port to listen on. Defaults to %(default)d.")
+		parser.add_argument("-u", "--unix", metavar = "path", help = "Listen on this Unix domain socket instead of a TCP port.")
+		parser.add_argument("-j", "--jobs", metavar = "cnt", type = int, default = 2, help = "Number of worker processes, i.e., puzzles that are created concurrently. Defaults to %(default)d.")
+		parser.add_argument("-q", "--queue-size", metavar = "cnt", type = int, default = 16, help = "Number of requests that may wait for a free worker. Further requests are rejected with status 503 until the queue drains. Defaults to %(default)d.")
+		parser.add_argument("-t", "--timeout", metavar = "secs", type = float, default = 30, help = "Time after which reading a request or creating a puzzle is aborted with an error. Defaults to %(default).0f seconds.")
+		parser.add_argument("--max-request-size", metavar = "bytes", type = int, default = 1024 * 1024, help = "Reject requests that are larger than this. Defaults to %(default)d bytes.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
+	mc.register("serve", "Create puzzles on request through a local HTTP server", genparser, action = "pysuchsel.ActionServe:ActionServe")
+
+	def genparser(parser):
+		parser.add_argument("-s", "--suite", choices = [ "startup", "place", "crossword", "pack", "fill", "randomdist", "crypto", "svg", "verify" ], action = "append", help = "Only run this benchmark suite. Can be specified multiple times, defaults to all suites.")
+		parser.add_argument("-c", "--command", choices = [ "suchsel", "crossword", "solword", "crypto", "fonttest", "batch", "serve", "find" ], action = "append", help = "Only measure the startup time of this command. Can be specified multiple times, defaults to all commands.")
+		parser.add_argument("-w", "--words", metavar = "cnt", type = int, default = 200, help = "Number of synthetic words to place. Defaults to %(default)d.")
+		parser.add_argument("--seed", metavar = "value", type = int, default = 1, help = "Seed for the synthetic inputs and the placement. Defaults to %(default)d.")
+		parser.add_argument("-n", "--repeat", metavar = "cnt", type = int, default = 3, help = "Run every benchmark this many times and report the fastest run. Defaults to %(default)d.")
+		parser.add_argument("--no-memory", action = "store_true", help = "Do not determine the peak memory usage, which requires an additional traced run of every benchmark.")
+		parser.add_argument("-t", "--top", metavar = "cnt", type = int, default = 5, help = "Number of slowest imports to report per command. Defaults to %(default)d.")
+		parser.add_argument("-o", "--output", metavar = "filename", help = "Write the results as JSON to this file. It can be used as a baseline later on.")
+		parser.add_argument("-b", "--baseline", metavar = "filename", help = "Compare the results against this JSON file of an earlier run.")
+		parser.add_argument("--tolerance", metavar = "percent", type = float, default = 10, help = "When comparing against a baseline, report a regression if throughput drops by more than this. Defaults to %(default).0f%%.")
+		parser.add_argument("-v", "--verbose", action = "count", default = 0, help = "Increase verbosity. Can be specified multiple times.")
+	mc.register("benchmark", "Measure startup time and throughput of placement, filling and rendering", genparser, action = "pysuchsel.ActionBenchmark:ActionBenchmark", visible = False)
+	return mc
+
+def main():
+	mc = create_multicommand()
 	return mc.run(sys.argv[1:])
 
 if __name__  == "__main__":
@@ -16,9 +16,7 @@ setuptools.setup(
 	url = "https://github.com/johndoe31415/pysuchsel",
 	download_url = "https://github.com/johndoe31415/pysuchsel/archive/v0.0.2rc0.tar.gz",
 	keywords = [ "puzzle", "crossword", "suchsel" ],
-	install_requires = [
-		"pysvgedit>=0.0.4",
-	],
+	install_requires = [ ],
 	entry_points = {
 		"console_scripts": [
 			"pysuchsel = pysuchsel.__main__:main",